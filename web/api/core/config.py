@@ -30,6 +30,12 @@ class Settings:
     DB_POOL_MIN_CONN: int = 2
     DB_POOL_MAX_CONN: int = 10
     DB_POOL_TIMEOUT: int = 30
+    DB_HEALTH_CHECK_TIMEOUT: float = float(os.getenv("DB_HEALTH_CHECK_TIMEOUT", "3.0"))
+    DB_HEALTH_POOL_MAX_CONN: int = 2
+    
+    # Health check latency bands (milliseconds) - hard-coded
+    HEALTH_LATENCY_WARNING_MS: int = 25
+    HEALTH_LATENCY_DEGRADED_MS: int = 100
     
     # Google Cloud Storage - hard-coded
     GCS_TIMEOUT: int = 30
@@ -67,4 +73,9 @@ class Settings:
 settings = Settings()
 
 # Validate settings on import
-settings.__post_init__()
\ No newline at end of file
+settings.__post_init__()
+
+
+def get_settings() -> Settings:
+    """Dependency for the application settings"""
+    return settings
\ No newline at end of file
@@ -2,6 +2,7 @@
 Dependency injection setup for KarlCam Fog API
 """
 import sys
+import math
 import logging
 from pathlib import Path
 from typing import Generator
@@ -21,17 +22,19 @@ logger = logging.getLogger(__name__)
 # Global instances
 _db_manager = None
 _db_pool = None
+_health_db_pool = None
 _storage_client = None
 
 
 class DatabasePool:
     """Database connection pool manager"""
     
-    def __init__(self, database_url: str, min_conn: int = 2, max_conn: int = 10):
+    def __init__(self, database_url: str, min_conn: int = 2, max_conn: int = 10, **connect_kwargs):
         self.pool = psycopg2.pool.ThreadedConnectionPool(
             min_conn,
             max_conn,
-            database_url
+            database_url,
+            **connect_kwargs
         )
         logger.info(f"Database pool created with {min_conn}-{max_conn} connections")
     
@@ -66,6 +69,27 @@ def get_db_pool() -> DatabasePool:
     return _db_pool
 
 
+def get_health_db_pool() -> DatabasePool:
+    """Get the small connection pool reserved for health probes (singleton)
+
+    Kept apart from the request pool so probes stuck on a hung database cannot
+    starve request traffic. The server cancels probe queries at the health
+    timeout, which hands their connections back.
+    """
+    global _health_db_pool
+    if _health_db_pool is None:
+        timeout = settings.DB_HEALTH_CHECK_TIMEOUT
+        _health_db_pool = DatabasePool(
+            database_url=settings.DATABASE_URL,
+            min_conn=0,
+            max_conn=settings.DB_HEALTH_POOL_MAX_CONN,
+            # libpq only takes whole seconds here, and treats anything below 2 as 2
+            connect_timeout=max(2, math.ceil(timeout)),
+            options=f"-c statement_timeout={int(timeout * 1000)}"
+        )
+    return _health_db_pool
+
+
 def get_db_manager() -> DatabaseManager:
     """Get database manager instance (singleton)"""
     global _db_manager
@@ -82,6 +106,14 @@ def get_db_session() -> Generator:
         yield conn
 
 
+@contextmanager
+def get_health_db_session() -> Generator:
+    """Get a connection from the health probe pool"""
+    pool = get_health_db_pool()
+    with pool.get_connection() as conn:
+        yield conn
+
+
 def get_db():
     """Dependency for direct database connection"""
     with get_db_session() as db:
@@ -103,9 +135,12 @@ def get_bucket_name() -> str:
 
 def cleanup_dependencies():
     """Cleanup all global dependencies"""
-    global _db_pool, _storage_client
+    global _db_pool, _health_db_pool, _storage_client
     if _db_pool:
         _db_pool.close_all()
         _db_pool = None
+    if _health_db_pool:
+        _health_db_pool.close_all()
+        _health_db_pool = None
     _storage_client = None
     logger.info("Dependencies cleaned up")
\ No newline at end of file
@@ -10,7 +10,7 @@ from datetime import datetime
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from web.api.core.config import settings
@@ -184,6 +184,7 @@ app = FastAPI(
         "showCommonExtensions": True,
         "tryItOutEnabled": True,
     },
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -201,7 +202,7 @@ app.add_middleware(
 @app.exception_handler(KarlCamException)
 async def karlcam_exception_handler(request: Request, exc: KarlCamException):
     """Handle custom KarlCam exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "detail": exc.detail,
@@ -215,7 +216,7 @@ async def karlcam_exception_handler(request: Request, exc: KarlCamException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "detail": "Validation error",
@@ -230,7 +231,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
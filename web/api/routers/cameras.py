@@ -9,7 +9,7 @@ from fastapi import APIRouter, HTTPException, Depends, Path, Query
 from typing import Optional
 from datetime import datetime
 
-from ..services.camera_service import CameraService
+from ..services.camera_service import CameraService, get_camera_service
 from ..services.on_demand_service import OnDemandService
 from ..core.dependencies import get_db_manager
 from ..core.config import settings
@@ -139,9 +139,8 @@ router = APIRouter(
         }
     }
 )
-async def get_cameras(db_manager=Depends(get_db_manager)):
+async def get_cameras(service: CameraService = Depends(get_camera_service)):
     """Get latest fog assessment for all cameras"""
-    service = CameraService(db_manager)
     camera_data = service.get_latest_camera_data()
     
     cameras = [CameraResponse(**camera) for camera in camera_data]
@@ -154,9 +153,8 @@ async def get_cameras(db_manager=Depends(get_db_manager)):
 
 
 @router.get("/webcams", response_model=WebcamsListResponse)
-async def get_webcams(db_manager=Depends(get_db_manager)):
+async def get_webcams(service: CameraService = Depends(get_camera_service)):
     """Get all webcam locations for the map"""
-    service = CameraService(db_manager)
     webcam_data = service.get_webcam_list()
     
     webcams = [WebcamResponse(**webcam) for webcam in webcam_data]
@@ -169,10 +167,9 @@ async def get_webcams(db_manager=Depends(get_db_manager)):
 
 
 @router.get("/cameras/{camera_id}/latest-image", response_model=ImageInfoResponse)
-async def get_latest_image_url(camera_id: str, db_manager=Depends(get_db_manager)):
+async def get_latest_image_url(camera_id: str, service: CameraService = Depends(get_camera_service)):
     """Get the latest collected image URL for a camera"""
     try:
-        service = CameraService(db_manager)
         image_info = service.get_latest_image_info(camera_id)
         return ImageInfoResponse(**image_info)
     except Exception as e:
@@ -272,11 +269,9 @@ async def get_camera_detail(
         description="Hours of historical data to include (default: 24, max: 168)",
         example=24
     ),
-    db_manager=Depends(get_db_manager)
+    service: CameraService = Depends(get_camera_service)
 ):
     """Get detailed information and history for a specific camera"""
-    service = CameraService(db_manager)
-    
     # Get current camera data
     camera_data = service.get_latest_camera_data()
     current_camera = next((c for c in camera_data if c["id"] == camera_id), None)
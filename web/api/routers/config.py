@@ -4,10 +4,10 @@ Configuration endpoints for KarlCam Fog API
 This module provides endpoints for accessing system configuration settings
 and parameters.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
 
-from ..core.config import settings
+from ..core.config import Settings, get_settings
 from ..schemas.common import (
     PublicConfigResponse,
     FullConfigResponse,
@@ -93,7 +93,7 @@ router = APIRouter(
         }
     }
 )
-async def get_public_config():
+async def get_public_config(settings: Settings = Depends(get_settings)):
     """Get public configuration settings (non-sensitive)"""
     return PublicConfigResponse(
         app_name=settings.APP_NAME,
@@ -113,7 +113,7 @@ async def get_public_config():
 
 
 @router.get("/full", response_model=FullConfigResponse)
-async def get_full_config():
+async def get_full_config(settings: Settings = Depends(get_settings)):
     """Get full configuration (admin only - no authentication implemented yet)"""
     # NOTE: In a production system, this would require admin authentication
     # For now, we'll only expose in development environment
@@ -1,18 +1,28 @@
 """
 Health check endpoints for KarlCam Fog API
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Response
+import asyncio
 from datetime import datetime
-import sys
-from pathlib import Path
+from typing import Optional, Tuple
+import time
 
-# Add parent directory to path for db imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
-
-from db.connection import get_db_connection
-from ..core.dependencies import get_db_manager
+from ..core.config import settings
+from ..core.dependencies import get_health_db_session
 from ..schemas.common import HealthResponse
 
+# Serialized root payload, reused while younger than _ROOT_CACHE_TTL seconds
+_ROOT_CACHE_TTL = 30
+_root_cache: Optional[Tuple[float, bytes]] = None
+
+# Everything in the root payload but the timestamp is fixed, so it is encoded once
+_ROOT_PAYLOAD_HEAD = b'{"status":"healthy","service":"KarlCam Fog API","version":"2.0.0","timestamp":"'
+_ROOT_PAYLOAD_TAIL = b'"}'
+
+# Last healthy /health result, replayed as stale while a dependency is failing
+_HEALTH_STALE_TTL = 60
+_last_ok: Optional[Tuple[float, HealthResponse]] = None
+
 router = APIRouter(
     tags=["Health"],
     responses={
@@ -75,17 +85,18 @@ router = APIRouter(
 )
 async def root():
     """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        service="KarlCam Fog API",
-        version="2.0.0",
-        timestamp=datetime.now().isoformat()
-    )
+    global _root_cache
+    now = time.monotonic()
+    if _root_cache is None or now - _root_cache[0] >= _ROOT_CACHE_TTL:
+        timestamp = datetime.now().isoformat().encode()
+        _root_cache = (now, _ROOT_PAYLOAD_HEAD + timestamp + _ROOT_PAYLOAD_TAIL)
+    return Response(content=_root_cache[1], media_type="application/json")
 
 
 @router.get(
     "/health",
     response_model=HealthResponse,
+    response_model_exclude_none=True,
     summary="Comprehensive service health with dependency checks",
     description="""
     Comprehensive health check that tests all critical system dependencies including
@@ -100,7 +111,9 @@ async def root():
     ## Health Status Levels
     
     * **healthy**: All systems operational, all dependencies accessible
-    * **degraded**: Service running but some dependencies unavailable  
+    * **warning**: All dependencies accessible, but the slowest check took 25-100ms
+    * **degraded**: Service running but some dependencies unavailable or slower than 100ms  
+      (marked `stale` when it repeats the last healthy result from the past minute)
     * **unhealthy**: Critical failures preventing normal operation
     
     ## Use Cases
@@ -130,6 +143,7 @@ async def root():
                     "example": {
                         "status": "healthy",
                         "database": "connected",
+                        "db_latency_ms": 4.2,
                         "service": "KarlCam Fog API",
                         "version": "2.0.0", 
                         "timestamp": "2024-01-10T08:30:00Z"
@@ -154,21 +168,86 @@ async def root():
 )
 async def health():
     """Health check with database status"""
-    try:
-        # Test database connection
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
+    global _last_ok
+    # Probe every subsystem concurrently so latency tracks the slowest check
+    results = await asyncio.gather(
+        *(_run_check(probe) for _, probe in CHECKS),
+        return_exceptions=True
+    )
+    failures = {
+        name: result for (name, _), result in zip(CHECKS, results)
+        if isinstance(result, Exception)
+    }
+    
+    if not failures:
+        # Band the slowest check so callers can drain before a hard failure
+        latencies = dict(zip((name for name, _ in CHECKS), results))
+        slowest = max(latencies.values(), default=0.0)
+        if slowest < settings.HEALTH_LATENCY_WARNING_MS:
+            status = "healthy"
+        elif slowest < settings.HEALTH_LATENCY_DEGRADED_MS:
+            status = "warning"
+        else:
+            status = "degraded"
         
-        return HealthResponse(
-            status="healthy",
+        response = HealthResponse(
+            status=status,
             database="connected",
+            db_latency_ms=latencies.get("database"),
             timestamp=datetime.now().isoformat()
         )
-    except Exception as e:
-        return HealthResponse(
-            status="degraded",
-            database="disconnected",
-            error=str(e),
-            timestamp=datetime.now().isoformat()
-        )
\ No newline at end of file
+        if status == "healthy":
+            _last_ok = (time.monotonic(), response)
+        return response
+    
+    # wait_for raises a bare TimeoutError with no message of its own
+    error = "; ".join(
+        str(e) or f"{name} health check timeout after {settings.DB_HEALTH_CHECK_TIMEOUT}s"
+        for name, e in failures.items()
+    )
+    
+    # Replay a recent healthy result rather than reporting a bare outage
+    if _last_ok is not None and time.monotonic() - _last_ok[0] < _HEALTH_STALE_TTL:
+        return _last_ok[1].model_copy(update={
+            "status": "degraded",
+            "database": "disconnected" if "database" in failures else "connected",
+            "db_latency_ms": None,
+            "stale": True,
+            "error": error,
+        })
+    
+    return HealthResponse(
+        status="degraded",
+        database="disconnected" if "database" in failures else "connected",
+        error=error,
+        timestamp=datetime.now().isoformat()
+    )
+
+
+async def _run_check(probe) -> float:
+    """Run a blocking probe off the event loop, bounded by the health timeout"""
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(
+        loop.run_in_executor(None, _timed, probe),
+        timeout=settings.DB_HEALTH_CHECK_TIMEOUT
+    )
+
+
+def _timed(probe) -> float:
+    """Run a probe and return its latency in milliseconds"""
+    start = time.perf_counter()
+    probe()
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _probe_db():
+    """Run a trivial query on the health pool to confirm the database is reachable"""
+    with get_health_db_session() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+
+
+# Subsystems probed by /health, as (name, blocking probe) pairs
+CHECKS = [
+    ("database", _probe_db),
+]
\ No newline at end of file
@@ -3,11 +3,16 @@ Image serving endpoints for KarlCam Fog API
 
 This module provides endpoints for accessing camera images stored in Cloud Storage.
 """
-from fastapi import APIRouter, Depends, Path
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Path, Response
 from fastapi.responses import RedirectResponse
 
-from ..services.image_service import ImageService
-from ..core.dependencies import get_storage_client, get_bucket_name
+from ..services.image_service import ImageService, get_image_service
+
+# Headers shared by every image redirect; cache for 1 hour
+_REDIRECT_HEADERS = {"Cache-Control": "public, max-age=3600"}
 
 router = APIRouter(
     tags=["Images"],
@@ -17,20 +22,20 @@ router = APIRouter(
             "content": {
                 "application/json": {
                     "example": {
-                        "detail": "Image file not found",
+                        "detail": "Image golden-gate-north_2024-01-10T08-30-00Z.jpg not found",
                         "error_code": "IMAGE_NOT_FOUND",
                         "timestamp": "2024-01-10T08:30:00Z"
                     }
                 }
             }
         },
-        500: {
-            "description": "Internal server error",
+        502: {
+            "description": "Cloud Storage access failed",
             "content": {
                 "application/json": {
                     "example": {
-                        "detail": "Cloud Storage access failed",
-                        "error_code": "STORAGE_ERROR",
+                        "detail": "Failed to get image URL for golden-gate-north_2024-01-10T08-30-00Z.jpg",
+                        "error_code": "CLOUD_STORAGE_ERROR",
                         "timestamp": "2024-01-10T08:30:00Z"
                     }
                 }
@@ -69,9 +74,13 @@ router = APIRouter(
     
     ## Response Behavior
     
-    Returns a **302 redirect** to the direct Cloud Storage URL, allowing
+    Returns a **307 redirect** to the direct Cloud Storage URL, allowing
     clients to access the image directly from Google's infrastructure.
     
+    Each redirect carries an `ETag` derived from the filename. Clients that
+    send it back in `If-None-Match` receive a **304 Not Modified** without
+    the storage URL being resolved again.
+    
     ## Use Cases
     
     * Displaying camera images in web applications
@@ -81,7 +90,10 @@ router = APIRouter(
     """,
     response_description="Redirect to direct Cloud Storage image URL",
     responses={
-        302: {
+        304: {
+            "description": "Cached redirect is still valid for the supplied ETag"
+        },
+        307: {
             "description": "Redirect to direct image URL in Cloud Storage",
             "headers": {
                 "Location": {
@@ -93,6 +105,10 @@ router = APIRouter(
                     "description": "Caching directive for the redirect",
                     "schema": {"type": "string"},
                     "example": "public, max-age=3600"
+                },
+                "ETag": {
+                    "description": "Validator for conditional requests with If-None-Match",
+                    "schema": {"type": "string"}
                 }
             }
         }
@@ -104,16 +120,30 @@ async def serve_image(
         description="Image filename including camera ID and timestamp",
         example="golden-gate-north_2024-01-10T08-30-00Z.jpg"
     ),
-    storage_client=Depends(get_storage_client),
-    bucket_name: str = Depends(get_bucket_name)
+    if_none_match: Optional[str] = Header(None),
+    service: ImageService = Depends(get_image_service)
 ):
     """Redirect to direct Cloud Storage image URL"""
-    service = ImageService(storage_client, bucket_name)
+    etag = _image_etag(filename)
+    
+    # The client already holds this redirect; skip resolving the storage URL
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        response = Response(status_code=304, headers=_REDIRECT_HEADERS)
+        response.headers["ETag"] = etag
+        return response
+    
     direct_url = service.get_image_url(filename)
     
     # Redirect to direct GCS URL to eliminate bandwidth doubling
-    return RedirectResponse(
+    response = RedirectResponse(
         url=direct_url,
-        status_code=302,
-        headers={"Cache-Control": "public, max-age=3600"}  # Cache for 1 hour
-    )
\ No newline at end of file
+        status_code=307,
+        headers=_REDIRECT_HEADERS
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+def _image_etag(filename: str) -> str:
+    """Strong ETag for the redirect served for a filename"""
+    return f'"{hashlib.sha1(filename.encode()).hexdigest()}"'
\ No newline at end of file
@@ -4,10 +4,10 @@ System and stats endpoints for KarlCam Fog API
 This module provides endpoints for system-wide statistics, status monitoring,
 and administrative operations.
 """
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body
 from datetime import datetime
 
-from ..services.stats_service import StatsService
+from ..services.stats_service import StatsService, get_stats_service
 from ..schemas.common import (
     StatsResponse,
     SystemStatusResponse,
@@ -94,17 +94,15 @@ router = APIRouter(
         }
     }
 )
-async def get_stats():
+async def get_stats(service: StatsService = Depends(get_stats_service)):
     """Get overall fog statistics"""
-    service = StatsService()
     stats_data = service.get_overall_stats()
     return StatsResponse(**stats_data)
 
 
 @router.get("/system/status", response_model=SystemStatusResponse)
-async def get_system_status():
+async def get_system_status(service: StatsService = Depends(get_stats_service)):
     """Get system status including karlcam mode"""
-    service = StatsService()
     status_data = service.get_system_status()
     return SystemStatusResponse(**status_data)
 
@@ -196,11 +194,11 @@ async def set_system_status(
                 }
             }
         }
-    )
+    ),
+    service: StatsService = Depends(get_stats_service)
 ):
     """Set system status - for internal use by labeler"""
     try:
-        service = StatsService()
         result = service.set_system_status(request.dict())
         return SystemStatusUpdateResponse(**result)
     except Exception as e:
@@ -5,12 +5,21 @@ Test runner script for KarlCam API
 This script provides convenient commands for running tests with various configurations
 and generating coverage reports.
 """
+import os
 import sys
 import subprocess
 import argparse
 from pathlib import Path
 
 
+# Skip .pyc writes in every pytest process (and every xdist worker)
+TEST_ENV = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+
+# CI fast path: quiet output, no warnings summary, all cores. pytest.ini already
+# disables the cache provider and header for every run.
+CI_FAST_ARGS = ["-q", "-p", "no:warnings", "-n", "auto"]
+
+
 def run_command(cmd, description):
     """Run a command and print its output"""
     print(f"\n{'='*60}")
@@ -19,7 +28,7 @@ def run_command(cmd, description):
     print(f"{'='*60}")
     
     try:
-        result = subprocess.run(cmd, check=True, capture_output=False)
+        result = subprocess.run(cmd, check=True, capture_output=False, env=TEST_ENV)
         print(f"\n✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -28,16 +37,16 @@ def run_command(cmd, description):
 
 
 def run_unit_tests(verbose=False):
-    """Run unit tests only"""
-    cmd = ["python", "-m", "pytest", "tests/", "-m", "unit"]
+    """Run unit tests only, keeping each module on one xdist worker"""
+    cmd = ["python", "-m", "pytest", "tests/", "-m", "unit", "-n", "auto", "--dist", "loadscope"]
     if verbose:
         cmd.append("-v")
     return run_command(cmd, "Unit Tests")
 
 
 def run_integration_tests(verbose=False):
-    """Run integration tests only"""
-    cmd = ["python", "-m", "pytest", "tests/", "-m", "integration"]
+    """Run integration tests only, spread across workers with pytest-xdist"""
+    cmd = ["python", "-m", "pytest", "tests/", "-m", "integration", "-n", "auto"]
     if verbose:
         cmd.append("-v")
     return run_command(cmd, "Integration Tests")
@@ -51,9 +60,11 @@ def run_all_tests(verbose=False):
     return run_command(cmd, "All Tests")
 
 
-def run_tests_with_coverage(test_type="all", html=False, verbose=False):
+def run_tests_with_coverage(test_type="all", html=False, verbose=False, fast=False):
     """Run tests with coverage reporting"""
     cmd = ["python", "-m", "pytest", "tests/", "--cov=.", "--cov-report=term-missing"]
+    if fast:
+        cmd.extend(CI_FAST_ARGS)
     
     if test_type == "unit":
         cmd.extend(["-m", "unit"])
@@ -77,12 +88,28 @@ def run_coverage_report():
 
 def run_parallel_tests(workers=4, verbose=False):
     """Run tests in parallel"""
-    cmd = ["python", "-m", "pytest", "tests/", "-n", str(workers)]
+    cmd = ["python", "-m", "pytest", "tests/", "-n", str(workers), "--dist", "loadscope"]
     if verbose:
         cmd.append("-v")
     return run_command(cmd, f"Parallel Tests ({workers} workers)")
 
 
+def run_benchmarks(save=None, compare=False, codspeed=False):
+    """Run the benchmark tests, optionally saving or comparing against a baseline"""
+    if codspeed:
+        # CodSpeed counts instructions, so results stay stable on shared CI runners
+        cmd = ["python", "-m", "pytest", "tests/", "--codspeed",
+               "--codspeed-mode=instrumentation", "--no-cov"]
+        return run_command(cmd, "Benchmarks (CodSpeed)")
+    
+    cmd = ["python", "-m", "pytest", "tests/", "--benchmark-only", "--no-cov"]
+    if save:
+        cmd.append(f"--benchmark-save={save}")
+    if compare:
+        cmd.extend(["--benchmark-compare", "--benchmark-compare-fail=mean:10%"])
+    return run_command(cmd, "Benchmarks")
+
+
 def check_coverage_threshold(threshold=80):
     """Check if coverage meets minimum threshold"""
     cmd = ["python", "-m", "coverage", "report", "--fail-under", str(threshold)]
@@ -104,7 +131,8 @@ def run_specific_test(test_path, verbose=False):
 
 def run_failed_tests():
     """Re-run only the tests that failed in the last run"""
-    cmd = ["python", "-m", "pytest", "--lf", "-v"]
+    # The cache plugin is disabled in pytest.ini; re-enable it for --lf
+    cmd = ["python", "-m", "pytest", "-p", "cacheprovider", "--lf", "-v"]
     return run_command(cmd, "Failed Tests (last failed)")
 
 
@@ -155,6 +183,14 @@ def main():
     parallel_parser.add_argument("-n", "--workers", type=int, default=4, 
                                 help="Number of parallel workers")
     
+    # Benchmarks
+    benchmark_parser = subparsers.add_parser("benchmark", help="Run performance benchmarks")
+    benchmark_parser.add_argument("--save", metavar="NAME", help="Save results as a named baseline")
+    benchmark_parser.add_argument("--compare", action="store_true",
+                                 help="Fail if mean time regresses more than 10%% against the last saved run")
+    benchmark_parser.add_argument("--codspeed", action="store_true",
+                                 help="Run under pytest-codspeed in instrumentation mode")
+    
     # Coverage report
     report_parser = subparsers.add_parser("report", help="Generate coverage report")
     
@@ -204,6 +240,9 @@ def main():
     elif args.command == "parallel":
         success = run_parallel_tests(args.workers, args.verbose)
     
+    elif args.command == "benchmark":
+        success = run_benchmarks(args.save, args.compare, args.codspeed)
+    
     elif args.command == "report":
         success = run_coverage_report()
     
@@ -230,7 +269,7 @@ def main():
         clean_coverage_data()
         
         # Step 2: Run all tests with coverage
-        success = run_tests_with_coverage("all", html=True, verbose=args.verbose)
+        success = run_tests_with_coverage("all", html=True, verbose=args.verbose, fast=True)
         
         if success:
             # Step 3: Check coverage threshold
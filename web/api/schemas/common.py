@@ -12,7 +12,9 @@ class HealthResponse(BaseModel):
     service: Optional[str] = None
     version: Optional[str] = None
     database: Optional[str] = None
+    db_latency_ms: Optional[float] = None
     error: Optional[str] = None
+    stale: Optional[bool] = None
     timestamp: str
 
 
@@ -252,7 +254,12 @@ class SystemStatusResponse(BaseModel):
 
 class SystemStatusUpdateRequest(BaseModel):
     """System status update request schema"""
-    karlcam_mode: int
+    karlcam_mode: int = Field(
+        ...,
+        ge=0,
+        le=1,
+        description="0 for normal operation, 1 for special mode"
+    )
     updated_by: Optional[str] = "api"
 
 
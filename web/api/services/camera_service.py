@@ -6,12 +6,14 @@ from datetime import datetime
 import logging
 import sys
 from pathlib import Path
+from fastapi import Depends
 
 # Add parent directory to path for db imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from db.manager import DatabaseManager
 from ..core.config import settings
+from ..core.dependencies import get_db_manager
 from ..utils.exceptions import (
     CameraNotFoundException,
     NoImagesFoundError,
@@ -167,4 +169,9 @@ class CameraService:
             raise
         except Exception as e:
             logger.error(f"Error fetching latest image for {camera_id}: {e}")
-            raise DataProcessingError(f"Failed to fetch latest image for {camera_id}")
\ No newline at end of file
+            raise DataProcessingError(f"Failed to fetch latest image for {camera_id}")
+
+
+def get_camera_service(db_manager: DatabaseManager = Depends(get_db_manager)) -> CameraService:
+    """Dependency for a CameraService bound to the request's database manager"""
+    return CameraService(db_manager)
\ No newline at end of file
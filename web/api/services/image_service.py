@@ -2,8 +2,10 @@
 Image service containing business logic for image operations
 """
 import logging
+from functools import lru_cache
 from google.cloud import storage
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException
+from ..core.dependencies import get_storage_client, get_bucket_name
 from ..utils.exceptions import ImageNotFoundException, CloudStorageError
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,9 @@ class ImageService:
     def __init__(self, storage_client: storage.Client, bucket_name: str):
         self.storage_client = storage_client
         self.bucket_name = bucket_name
+        # Resolved once, since a single instance serves every request
+        self.bucket = storage_client.bucket(bucket_name)
+        self.url_prefix = f"https://storage.googleapis.com/{bucket_name}/raw_images/"
     
     def get_image_url(self, filename: str) -> str:
         """Get direct Cloud Storage URL for image
@@ -23,18 +28,25 @@ class ImageService:
             str: Direct GCS URL
         """
         try:
-            bucket = self.storage_client.bucket(self.bucket_name)
-            blob = bucket.blob(f"raw_images/{filename}")
+            blob = self.bucket.blob(f"raw_images/{filename}")
             
             if not blob.exists():
                 raise ImageNotFoundException(filename)
             
             # Return direct public GCS URL
-            direct_url = f"https://storage.googleapis.com/{self.bucket_name}/raw_images/{filename}"
-            return direct_url
+            return self.url_prefix + filename
             
         except ImageNotFoundException:
             raise
         except Exception as e:
             logger.error(f"Error getting image URL {filename}: {e}")
-            raise CloudStorageError(f"Failed to get image URL for {filename}")
\ No newline at end of file
+            raise CloudStorageError(f"Failed to get image URL for {filename}")
+
+
+@lru_cache(maxsize=1)
+def get_image_service(
+    storage_client: storage.Client = Depends(get_storage_client),
+    bucket_name: str = Depends(get_bucket_name)
+) -> ImageService:
+    """Dependency for the ImageService bound to the storage client and bucket, built once"""
+    return ImageService(storage_client, bucket_name)
\ No newline at end of file
@@ -112,4 +112,9 @@ class StatsService:
                     
         except Exception as e:
             logger.error(f"Error setting system status: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+def get_stats_service() -> StatsService:
+    """Dependency for a StatsService"""
+    return StatsService()
\ No newline at end of file
@@ -1,12 +1,15 @@
 """
 Test configuration and fixtures for KarlCam API
 """
+import copy
+from contextlib import nullcontext
+from types import SimpleNamespace
 import pytest
 import asyncio
 from typing import Generator, AsyncGenerator
 from unittest.mock import Mock, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
 
 # Import the main app and dependencies
 import sys
@@ -17,8 +20,13 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from web.api.main import app
+from web.api.routers import health as health_router
 from web.api.core.dependencies import get_db_manager
 from web.api.core.config import settings
+from web.api.services.camera_service import CameraService, get_camera_service
+from web.api.services.image_service import ImageService, get_image_service
+from web.api.services.stats_service import StatsService, get_stats_service
+from tests import factories
 
 # Test settings override
 class TestSettings:
@@ -41,42 +49,125 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture
+def _configure_db_manager(mock):
+    """Install the default return values on the database manager mock"""
+    mock.get_recent_images.return_value = []
+    mock.get_active_webcams.return_value = []
+    mock.get_webcam.return_value = None
+    mock.get_recent_images_with_labels.return_value = []
+
+@pytest.fixture(scope="session")
 def mock_db_manager():
-    """Mock database manager for testing"""
+    """Mock database manager shared across the session"""
     mock = Mock()
-    
-    # Mock common methods
-    mock.get_recent_images = Mock(return_value=[])
-    mock.get_active_webcams = Mock(return_value=[])
-    mock.get_webcam = Mock(return_value=None)
-    mock.get_recent_images_with_labels = Mock(return_value=[])
-    
+    _configure_db_manager(mock)
     return mock
 
+@pytest.fixture(autouse=True)
+def seed_factories(request):
+    """Reseed factory data from the test id so xdist scheduling cannot change it"""
+    factories._rng.seed(request.node.nodeid)
+
+@pytest.fixture(autouse=True)
+def reset_db_manager(mock_db_manager):
+    """Give every test a clean database manager mock"""
+    yield
+    mock_db_manager.reset_mock(return_value=True, side_effect=True)
+    _configure_db_manager(mock_db_manager)
+
+@pytest.fixture(scope="session")
+def _camera_service_mock_template():
+    """CameraService mock built once; each module receives a shallow copy
+
+    spec_set rejects misspelled service methods, and child mocks created on first
+    access are kept by the template rather than rebuilt per test.
+    """
+    return Mock(spec_set=CameraService)
+
+@pytest.fixture(scope="module")
+def patched_camera_service(_camera_service_mock_template):
+    """CameraService mock served through get_camera_service for a whole module"""
+    mock = copy.copy(_camera_service_mock_template)
+    app.dependency_overrides[get_camera_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_camera_service, None)
+
+@pytest.fixture
+def camera_service_mock(patched_camera_service):
+    """The module's CameraService mock, with return values and side effects reset per test"""
+    yield patched_camera_service
+    patched_camera_service.reset_mock(return_value=True, side_effect=True)
+
 @pytest.fixture
-def test_client(mock_db_manager):
-    """Test client with mocked dependencies"""
-    # Override dependencies
+def image_service_mock():
+    """ImageService mock served through get_image_service"""
+    mock = Mock(spec=ImageService)
+    app.dependency_overrides[get_image_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_image_service, None)
+
+@pytest.fixture
+def stats_service_mock():
+    """StatsService mock served through get_stats_service"""
+    mock = Mock(spec=StatsService)
+    app.dependency_overrides[get_stats_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_stats_service, None)
+
+@pytest.fixture
+def mock_db_ok(monkeypatch):
+    """Healthy pooled session for the health router; returns the cursor mock"""
+    cursor = Mock()
+    connection = SimpleNamespace(cursor=lambda: nullcontext(cursor))
+    monkeypatch.setattr(health_router, "get_health_db_session", lambda: nullcontext(connection))
+    return cursor
+
+@pytest.fixture
+def mock_db_fail(monkeypatch):
+    """Factory making the health router's get_health_db_session raise the given exception"""
+    def fail(exc):
+        def get_health_db_session():
+            raise exc
+        monkeypatch.setattr(health_router, "get_health_db_session", get_health_db_session)
+    return fail
+
+@pytest.fixture(scope="session")
+def db_manager_override(mock_db_manager):
+    """Route get_db_manager to the mock for the whole session"""
     app.dependency_overrides[get_db_manager] = lambda: mock_db_manager
-    
-    with TestClient(app) as client:
+    yield
+    app.dependency_overrides.pop(get_db_manager, None)
+
+@pytest.fixture(scope="session")
+def test_client(db_manager_override):
+    """Test client with mocked dependencies, started once per session
+
+    Server exceptions are not re-raised, so unhandled errors reach the app's 500 handler.
+    """
+    with TestClient(app, raise_server_exceptions=False) as client:
         yield client
-    
-    # Clean up overrides
+
+@pytest.fixture(autouse=True)
+def restore_dependency_overrides():
+    """Undo dependency overrides a test installs on the shared app
+
+    Overrides from session- and module-scoped fixtures are already in place when
+    this runs, so they survive; only per-test additions are dropped.
+    """
+    saved = dict(app.dependency_overrides)
+    yield
     app.dependency_overrides.clear()
+    app.dependency_overrides.update(saved)
+
+# Stateless, so a single transport serves every async client. App exceptions are
+# not re-raised, so unhandled errors reach the 500 handler like they would in production
+_asgi_transport = ASGITransport(app=app, raise_app_exceptions=False)
 
 @pytest.fixture
-async def async_test_client(mock_db_manager):
-    """Async test client for testing async endpoints"""
-    # Override dependencies
-    app.dependency_overrides[get_db_manager] = lambda: mock_db_manager
-    
-    async with AsyncClient(app=app, base_url="http://test") as client:
+async def async_test_client(db_manager_override):
+    """Async test client dispatching in-process through the ASGI transport"""
+    async with AsyncClient(transport=_asgi_transport, base_url="http://test") as client:
         yield client
-    
-    # Clean up overrides
-    app.dependency_overrides.clear()
 
 @pytest.fixture
 def sample_webcam_data():
@@ -143,6 +234,16 @@ def sample_system_status():
         "updated_by": "system"
     }
 
+@pytest.fixture(scope="module")
+def multi_camera_scenario():
+    """Three cameras with one labelled image each, shared read-only across a module
+
+    Seeded explicitly, so its contents do not depend on which test requests it first;
+    seed_factories reseeds per test after this runs.
+    """
+    factories._rng.seed("multi_camera_scenario")
+    return factories.create_multi_camera_scenario(num_cameras=3)
+
 @pytest.fixture(autouse=True)
 def override_settings():
     """Override settings for all tests"""
@@ -176,8 +277,7 @@ def create_mock_webcam(webcam_id="test-webcam", **kwargs):
     defaults.update(kwargs)
     
     mock = Mock()
-    for key, value in defaults.items():
-        setattr(mock, key, value)
+    mock.configure_mock(**defaults)
     return mock
 
 def create_mock_image_with_labels(webcam_id="test-webcam", fog_score=50, **kwargs):
@@ -1,121 +1,196 @@
 """
 Test data factories for KarlCam API
 """
+import itertools
+import random
+import uuid
 import factory
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from faker import Faker
-from unittest.mock import Mock
 
-fake = Faker()
+# Seeded generator with static value tables; tests only rely on field shape
+_rng = random.Random(0)
+
+_CITIES = ("San Francisco", "Sausalito", "Oakland", "Berkeley", "Pacifica", "Daly City")
+_SENTENCES = (
+    "Marine layer over the bay.",
+    "Low clouds near the bridge towers.",
+    "Clear view of the skyline.",
+    "Patchy fog along the coast.",
+)
+_USER_NAMES = ("system", "admin", "scheduler", "operator")
+_FOG_SCORES = range(101)
+_FOG_LEVELS = ("Clear", "Light Fog", "Moderate Fog", "Heavy Fog", "Very Heavy Fog")
+
+# Tests never check timestamp freshness, so factories share one fixed value
+_FROZEN_DT = datetime(2024, 1, 10, 8, 30)
+_FROZEN_TS = _FROZEN_DT.isoformat() + "Z"
+_FROZEN_TS_SLUG = _FROZEN_DT.strftime("%Y%m%d_%H%M%S")
+
+_collection_ids = itertools.count(1)
+_label_ids = itertools.count(1)
+
+def _fog_level(score):
+    """Map a 0-100 fog score onto the five fog levels in 20-point bands"""
+    return _FOG_LEVELS[min(score // 20, len(_FOG_LEVELS) - 1)]
+
+def _fake_uuid():
+    return str(uuid.UUID(int=_rng.getrandbits(128), version=4))
+
+def _fake_city():
+    return _rng.choice(_CITIES)
+
+def _fake_sentence():
+    return _rng.choice(_SENTENCES)
+
+def _fake_url():
+    return f"https://cam{_rng.randrange(10000)}.example.com"
+
+def _fake_latitude():
+    return round(_rng.uniform(-90, 90), 6)
+
+def _fake_longitude():
+    return round(_rng.uniform(-180, 180), 6)
+
+@dataclass(slots=True)
+class FakeWebcam:
+    """Plain stand-in for the db Webcam model"""
+    
+    id: str
+    name: str
+    latitude: float
+    longitude: float
+    url: str
+    video_url: str
+    description: str
+    active: bool = True
+
+class FakeDBManager:
+    """Database manager double for workflow tests that never inspect calls"""
+    
+    def __init__(self):
+        self.webcams = []
+        self.recent_images = []
+        self.recent_images_error = None
+    
+    def get_active_webcams(self):
+        return self.webcams
+    
+    def get_webcam(self, webcam_id):
+        return next((webcam for webcam in self.webcams if webcam.id == webcam_id), None)
+    
+    def get_recent_images(self, webcam_id=None, days=1):
+        if self.recent_images_error is not None:
+            raise self.recent_images_error
+        return self.recent_images
 
 class WebcamFactory(factory.Factory):
     """Factory for creating webcam test data"""
     
     class Meta:
-        model = Mock
-    
-    id = factory.LazyFunction(lambda: fake.uuid4())
-    name = factory.LazyFunction(lambda: fake.city() + " Camera")
-    latitude = factory.LazyFunction(lambda: fake.latitude())
-    longitude = factory.LazyFunction(lambda: fake.longitude())
-    url = factory.LazyFunction(lambda: fake.url() + "/camera.jpg")
-    video_url = factory.LazyFunction(lambda: fake.url() + "/camera.mp4")
-    description = factory.LazyFunction(lambda: fake.sentence())
+        model = FakeWebcam
+    
+    id = factory.LazyFunction(_fake_uuid)
+    name = factory.LazyFunction(lambda: _fake_city() + " Camera")
+    latitude = factory.LazyFunction(_fake_latitude)
+    longitude = factory.LazyFunction(_fake_longitude)
+    url = factory.LazyFunction(lambda: _fake_url() + "/camera.jpg")
+    video_url = factory.LazyFunction(lambda: _fake_url() + "/camera.mp4")
+    description = factory.LazyFunction(_fake_sentence)
     active = True
 
 class ImageCollectionFactory(factory.DictFactory):
     """Factory for creating image collection test data"""
     
-    id = factory.Sequence(lambda n: n + 1)
-    webcam_id = factory.LazyFunction(lambda: fake.uuid4())
-    timestamp = factory.LazyFunction(lambda: datetime.now().isoformat() + "Z")
-    image_filename = factory.LazyAttribute(
-        lambda obj: f"{obj['webcam_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-    )
+    id = factory.LazyFunction(lambda: next(_collection_ids))
+    webcam_id = factory.LazyFunction(_fake_uuid)
+    timestamp = _FROZEN_TS
+    image_filename = factory.LazyAttribute(lambda obj: f"{obj.webcam_id}_{_FROZEN_TS_SLUG}.jpg")
     cloud_storage_path = factory.LazyAttribute(
-        lambda obj: f"gs://karlcam-test/raw_images/{obj['image_filename']}"
+        lambda obj: f"gs://karlcam-test/raw_images/{obj.image_filename}"
     )
 
 class ImageLabelFactory(factory.DictFactory):
     """Factory for creating image label test data"""
     
-    id = factory.Sequence(lambda n: n + 1)
-    image_id = factory.Sequence(lambda n: n + 1)
+    id = factory.LazyFunction(lambda: next(_label_ids))
+    image_id = factory.SelfAttribute("id")
     labeler_name = "gemini-1.5"
     labeler_version = "1.5.0"
-    fog_score = factory.LazyFunction(lambda: fake.random_int(min=0, max=100))
-    fog_level = factory.LazyFunction(lambda: fake.random_element(
-        elements=["Clear", "Light Fog", "Moderate Fog", "Heavy Fog", "Very Heavy Fog"]
-    ))
-    confidence = factory.LazyFunction(lambda: round(fake.random.uniform(0.5, 1.0), 2))
-    reasoning = factory.LazyFunction(lambda: fake.sentence())
+    fog_score = factory.LazyFunction(lambda: _rng.randint(0, 100))
+    fog_level = factory.LazyFunction(lambda: _rng.choice(_FOG_LEVELS))
+    confidence = factory.LazyFunction(lambda: round(_rng.uniform(0.5, 1.0), 2))
+    reasoning = factory.LazyFunction(_fake_sentence)
 
 class ImageWithLabelsFactory(factory.DictFactory):
     """Factory for creating image data with associated labels"""
     
-    webcam_id = factory.LazyFunction(lambda: fake.uuid4())
-    timestamp = factory.LazyFunction(lambda: datetime.now().isoformat() + "Z")
-    labels = factory.SubFactory(factory.ListFactory, factory.SubFactory(ImageLabelFactory), size=1)
+    webcam_id = factory.LazyFunction(_fake_uuid)
+    timestamp = _FROZEN_TS
+    labels = factory.List([factory.SubFactory(ImageLabelFactory)])
 
 class CameraConditionsFactory(factory.DictFactory):
     """Factory for creating camera conditions response data"""
     
-    id = factory.LazyFunction(lambda: fake.uuid4())
-    name = factory.LazyFunction(lambda: fake.city() + " Camera")
-    lat = factory.LazyFunction(lambda: float(fake.latitude()))
-    lon = factory.LazyFunction(lambda: float(fake.longitude()))
-    description = factory.LazyFunction(lambda: fake.sentence())
-    fog_score = factory.LazyFunction(lambda: fake.random_int(min=0, max=100))
-    fog_level = factory.LazyFunction(lambda: fake.random_element(
-        elements=["Clear", "Light Fog", "Moderate Fog", "Heavy Fog", "Very Heavy Fog"]
-    ))
-    confidence = factory.LazyFunction(lambda: round(fake.random.uniform(0.5, 1.0), 2))
-    weather_detected = factory.LazyAttribute(lambda obj: obj['fog_score'] > 20)
-    weather_confidence = factory.LazyFunction(lambda: round(fake.random.uniform(0.5, 1.0), 2))
-    timestamp = factory.LazyFunction(lambda: datetime.now().isoformat() + "Z")
+    id = factory.LazyFunction(_fake_uuid)
+    name = factory.LazyFunction(lambda: _fake_city() + " Camera")
+    lat = factory.LazyFunction(_fake_latitude)
+    lon = factory.LazyFunction(_fake_longitude)
+    description = factory.LazyFunction(_fake_sentence)
+    fog_score = factory.LazyFunction(lambda: _rng.randint(0, 100))
+    fog_level = factory.LazyFunction(lambda: _rng.choice(_FOG_LEVELS))
+    confidence = factory.LazyFunction(lambda: round(_rng.uniform(0.5, 1.0), 2))
+    weather_detected = factory.LazyAttribute(lambda obj: obj.fog_score > 20)
+    weather_confidence = factory.LazyFunction(lambda: round(_rng.uniform(0.5, 1.0), 2))
+    timestamp = _FROZEN_TS
     active = True
 
 class SystemStatusFactory(factory.DictFactory):
     """Factory for creating system status data"""
     
-    karlcam_mode = factory.LazyFunction(lambda: fake.random_element(elements=[0, 1]))
-    description = factory.LazyFunction(lambda: fake.sentence())
-    updated_at = factory.LazyFunction(lambda: datetime.now().isoformat() + "Z")
-    updated_by = factory.LazyFunction(lambda: fake.user_name())
+    karlcam_mode = factory.LazyFunction(lambda: _rng.choice((0, 1)))
+    description = factory.LazyFunction(_fake_sentence)
+    updated_at = _FROZEN_TS
+    updated_by = factory.LazyFunction(lambda: _rng.choice(_USER_NAMES))
 
 class StatsResponseFactory(factory.DictFactory):
     """Factory for creating statistics response data"""
     
-    total_assessments = factory.LazyFunction(lambda: fake.random_int(min=100, max=10000))
-    active_cameras = factory.LazyFunction(lambda: fake.random_int(min=5, max=20))
-    avg_fog_score = factory.LazyFunction(lambda: round(fake.random.uniform(0, 100), 2))
-    avg_confidence = factory.LazyFunction(lambda: round(fake.random.uniform(0.5, 1.0), 2))
-    foggy_conditions = factory.LazyFunction(lambda: fake.random_int(min=10, max=1000))
-    last_update = factory.LazyFunction(lambda: datetime.now().isoformat() + "Z")
+    total_assessments = factory.LazyFunction(lambda: _rng.randint(100, 10000))
+    active_cameras = factory.LazyFunction(lambda: _rng.randint(5, 20))
+    avg_fog_score = factory.LazyFunction(lambda: round(_rng.uniform(0, 100), 2))
+    avg_confidence = factory.LazyFunction(lambda: round(_rng.uniform(0.5, 1.0), 2))
+    foggy_conditions = factory.LazyFunction(lambda: _rng.randint(10, 1000))
+    last_update = _FROZEN_TS
     period = "24 hours"
 
 # Special factories for specific test scenarios
+_FOGGY_LABEL = {
+    "id": 1,
+    "image_id": 1,
+    "labeler_name": "gemini-1.5",
+    "labeler_version": "1.5.0",
+    "fog_score": 80,
+    "fog_level": "Heavy Fog",
+    "confidence": 0.9,
+    "reasoning": "Dense fog obscuring the bridge towers.",
+}
+_CLEAR_LABEL = {
+    **_FOGGY_LABEL,
+    "fog_score": 10,
+    "fog_level": "Clear",
+    "reasoning": "Clear view of the skyline.",
+}
+
 class FoggyImageFactory(ImageWithLabelsFactory):
     """Factory for creating images with high fog scores"""
     
-    labels = factory.LazyFunction(lambda: [
-        ImageLabelFactory(
-            fog_score=fake.random_int(min=60, max=100),
-            fog_level=fake.random_element(elements=["Heavy Fog", "Very Heavy Fog"]),
-            confidence=fake.random.uniform(0.8, 1.0)
-        )
-    ])
+    labels = factory.LazyFunction(lambda: [_FOGGY_LABEL.copy()])
 
 class ClearImageFactory(ImageWithLabelsFactory):
     """Factory for creating images with low fog scores"""
     
-    labels = factory.LazyFunction(lambda: [
-        ImageLabelFactory(
-            fog_score=fake.random_int(min=0, max=20),
-            fog_level="Clear",
-            confidence=fake.random.uniform(0.8, 1.0)
-        )
-    ])
+    labels = factory.LazyFunction(lambda: [_CLEAR_LABEL.copy()])
 
 class NightModeStatusFactory(SystemStatusFactory):
     """Factory for creating night mode system status"""
@@ -130,44 +205,93 @@ class ActiveModeStatusFactory(SystemStatusFactory):
     description = "Active mode - normal operation"
 
 # Utility functions for creating complex test scenarios
+_SCENARIO_WEBCAM = {
+    "latitude": 37.7749,
+    "longitude": -122.4194,
+    "url": "https://cam.example.com/camera.jpg",
+    "video_url": "https://cam.example.com/camera.mp4",
+    "description": "Scenario camera",
+    "active": True,
+}
+
+_BATCH_LABEL = {
+    "labeler_name": "gemini-1.5",
+    "labeler_version": "1.5.0",
+    "confidence": 0.9,
+    "reasoning": "",
+}
+
+def _scenario_webcam(**fields):
+    """Build a webcam directly, skipping factory declaration resolution"""
+    return FakeWebcam(**_SCENARIO_WEBCAM, **fields)
+
+def build_labels_batch(fog_scores):
+    """Build one label dict per fog score without going through ImageLabelFactory"""
+    return [
+        {
+            **_BATCH_LABEL,
+            "id": label_id,
+            "image_id": label_id,
+            "fog_score": score,
+            "fog_level": _fog_level(score),
+        }
+        for score, label_id in zip(fog_scores, _label_ids)
+    ]
+
 def create_webcam_with_recent_images(webcam_id=None, num_images=3, fog_scores=None):
     """Create a webcam with recent images for testing"""
     if webcam_id is None:
-        webcam_id = fake.uuid4()
+        webcam_id = _fake_uuid()
     
-    webcam = WebcamFactory(id=webcam_id)
+    webcam = _scenario_webcam(id=webcam_id, name=f"Camera {webcam_id}")
     
     if fog_scores is None:
-        fog_scores = [fake.random_int(min=0, max=100) for _ in range(num_images)]
+        fog_scores = _rng.choices(_FOG_SCORES, k=num_images)
     
-    images = []
-    for i, score in enumerate(fog_scores):
-        timestamp = datetime.now() - timedelta(minutes=i*10)
-        images.append(ImageWithLabelsFactory(
-            webcam_id=webcam_id,
-            timestamp=timestamp.isoformat() + "Z",
-            labels=[ImageLabelFactory(fog_score=score)]
-        ))
+    now = datetime.now()
+    images = [
+        {
+            "webcam_id": webcam_id,
+            "timestamp": (now - timedelta(minutes=i*10)).isoformat() + "Z",
+            "labels": [label],
+        }
+        for i, label in enumerate(build_labels_batch(fog_scores))
+    ]
     
     return webcam, images
 
 def create_multi_camera_scenario(num_cameras=3):
     """Create multiple cameras with varying fog conditions"""
-    cameras = []
-    images_by_camera = {}
-    
-    for i in range(num_cameras):
-        webcam_id = f"test-camera-{i+1}"
-        webcam = WebcamFactory(id=webcam_id, name=f"Test Camera {i+1}")
-        
-        # Create varying fog conditions
-        fog_score = fake.random_int(min=0, max=100)
-        images = [ImageWithLabelsFactory(
-            webcam_id=webcam_id,
-            labels=[ImageLabelFactory(fog_score=fog_score)]
-        )]
-        
-        cameras.append(webcam)
-        images_by_camera[webcam_id] = images
-    
-    return cameras, images_by_camera
\ No newline at end of file
+    cameras = [
+        _scenario_webcam(id=f"test-camera-{i+1}", name=f"Test Camera {i+1}")
+        for i in range(num_cameras)
+    ]
+    
+    # One image per camera with varying fog conditions
+    labels = build_labels_batch(_rng.choices(_FOG_SCORES, k=num_cameras))
+    images_by_camera = {
+        camera.id: [{
+            "webcam_id": camera.id,
+            # A datetime, as the DB returns it; CameraService calls isoformat() on it
+            "timestamp": _FROZEN_DT,
+            "labels": [label],
+        }]
+        for camera, label in zip(cameras, labels)
+    }
+    
+    return cameras, images_by_camera
+
+def create_camera_history(num_entries, base_score, score_step, base_confidence,
+                          confidence_step, hours_step=1):
+    """Create a camera's label history, newest first, stepping score and confidence per entry"""
+    return tuple(
+        {
+            "timestamp": _FROZEN_DT - timedelta(hours=i*hours_step),
+            "labels": [{
+                "fog_score": base_score + i*score_step,
+                "fog_level": _fog_level(base_score + i*score_step),
+                "confidence": round(base_confidence + i*confidence_step, 2),
+            }],
+        }
+        for i in range(num_entries)
+    )
\ No newline at end of file
@@ -1,37 +1,84 @@
 """
 Integration tests for API workflows
 """
+import functools
+import json
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime, timedelta
+from datetime import datetime
 
+from web.api.main import app
+from web.api.core.dependencies import get_db_manager
 from tests.factories import (
     CameraConditionsFactory,
+    FakeDBManager,
     WebcamFactory,
     create_webcam_with_recent_images,
-    create_multi_camera_scenario
+    create_multi_camera_scenario,
+    create_camera_history
 )
 
+pytestmark = pytest.mark.integration
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser gives the same result
+    _loads = json.loads
+
+def json_of(response):
+    """Decode a response body, with orjson when it is installed"""
+    return _loads(response.content)
+
+# Dashboard scenario data is invariant, so build it once at import
+_DASHBOARD_CAMERAS, _dashboard_images_by_camera = create_multi_camera_scenario(num_cameras=5)
+_DASHBOARD_IMAGES = tuple(
+    image for images in _dashboard_images_by_camera.values() for image in images
+)
+_DASHBOARD_HISTORY = create_camera_history(
+    6, base_score=70, score_step=-5, base_confidence=0.9, confidence_step=-0.01
+)
+
+@functools.lru_cache(maxsize=1)
+def _public_config(client):
+    """Fetch the static public configuration once per client"""
+    response = client.get("/api/config/public")
+    assert response.status_code == 200
+    return json_of(response)
+
+@pytest.fixture
+def fake_db_manager(test_client):
+    """Serve this test's requests from a fresh FakeDBManager"""
+    fake = FakeDBManager()
+    session_override = app.dependency_overrides.get(get_db_manager)
+    app.dependency_overrides[get_db_manager] = lambda: fake
+    yield fake
+    app.dependency_overrides[get_db_manager] = session_override
+
+@pytest.fixture
+def stats_service(stats_service_mock):
+    """StatsService mock the system router receives through get_stats_service"""
+    return stats_service_mock
+
 class TestCameraDataWorkflow:
     """Test complete camera data retrieval workflows"""
     
-    @pytest.mark.integration
-    def test_complete_camera_list_to_detail_workflow(self, test_client, mock_db_manager):
+    def test_complete_camera_list_to_detail_workflow(self, test_client, fake_db_manager,
+                                                     multi_camera_scenario):
         """Test complete workflow from camera list to individual camera details"""
         # Setup - Create multiple cameras
-        cameras, images_by_camera = create_multi_camera_scenario(num_cameras=3)
-        mock_db_manager.get_active_webcams.return_value = cameras
+        cameras, images_by_camera = multi_camera_scenario
+        fake_db_manager.webcams = cameras
         
         # Flatten images for recent_images mock
         all_images = []
         for images in images_by_camera.values():
             all_images.extend(images)
-        mock_db_manager.get_recent_images.return_value = all_images
+        fake_db_manager.recent_images = all_images
         
         # Step 1: Get camera list
         list_response = test_client.get("/api/public/cameras")
         assert list_response.status_code == 200
-        list_data = list_response.json()
+        list_data = json_of(list_response)
         
         assert list_data["count"] == 3
         assert len(list_data["cameras"]) == 3
@@ -43,18 +90,20 @@ class TestCameraDataWorkflow:
         # Mock camera history for detail endpoint
         history_data = [
             {
-                "fog_score": 65,
-                "fog_level": "Moderate Fog",
-                "confidence": 0.89,
-                "timestamp": datetime.now().isoformat() + "Z",
-                "reasoning": "Moderate fog visible"
+                "webcam_id": camera_id,
+                "timestamp": datetime(2024, 1, 10, 8, 30),
+                "labels": [{
+                    "fog_score": 65,
+                    "fog_level": "Moderate Fog",
+                    "confidence": 0.89
+                }]
             }
         ]
-        mock_db_manager.get_recent_images.return_value = history_data
+        fake_db_manager.recent_images = history_data
         
         detail_response = test_client.get(f"/api/public/cameras/{camera_id}")
         assert detail_response.status_code == 200
-        detail_data = detail_response.json()
+        detail_data = json_of(detail_response)
         
         # Verify consistency between list and detail
         assert detail_data["camera"]["id"] == camera_id
@@ -62,13 +111,12 @@ class TestCameraDataWorkflow:
         assert "history" in detail_data
         assert "history_hours" in detail_data
     
-    @pytest.mark.integration
-    def test_camera_with_latest_image_workflow(self, test_client, mock_db_manager):
+    def test_camera_with_latest_image_workflow(self, test_client, fake_db_manager):
         """Test workflow for getting camera with latest image"""
         # Setup
         camera_id = "test-camera-1"
         webcam = WebcamFactory(id=camera_id)
-        mock_db_manager.get_active_webcams.return_value = [webcam]
+        fake_db_manager.webcams = [webcam]
         
         # Mock recent images for camera list
         mock_images = [
@@ -82,12 +130,12 @@ class TestCameraDataWorkflow:
                 }]
             }
         ]
-        mock_db_manager.get_recent_images.return_value = mock_images
+        fake_db_manager.recent_images = mock_images
         
         # Step 1: Verify camera appears in list
         list_response = test_client.get("/api/public/cameras")
         assert list_response.status_code == 200
-        list_data = list_response.json()
+        list_data = json_of(list_response)
         
         camera_found = False
         for camera in list_data["cameras"]:
@@ -98,7 +146,7 @@ class TestCameraDataWorkflow:
         assert camera_found
         
         # Step 2: Get latest image for the camera
-        mock_db_manager.get_recent_images.return_value = [
+        fake_db_manager.recent_images = [
             {
                 'timestamp': datetime.now(),
                 'image_filename': 'test_image.jpg',
@@ -108,20 +156,19 @@ class TestCameraDataWorkflow:
         
         image_response = test_client.get(f"/api/public/cameras/{camera_id}/latest-image")
         assert image_response.status_code == 200
-        image_data = image_response.json()
+        image_data = json_of(image_response)
         
         assert image_data["camera_id"] == camera_id
         assert "image_url" in image_data
         assert "timestamp" in image_data
         assert "age_hours" in image_data
     
-    @pytest.mark.integration
-    def test_historical_data_workflow(self, test_client, mock_db_manager):
+    def test_historical_data_workflow(self, test_client, fake_db_manager):
         """Test workflow for retrieving historical camera data"""
         # Setup
         camera_id = "historical-camera"
         webcam = WebcamFactory(id=camera_id)
-        mock_db_manager.get_active_webcams.return_value = [webcam]
+        fake_db_manager.webcams = [webcam]
         
         # Mock for camera list (need recent data)
         recent_image = {
@@ -129,30 +176,23 @@ class TestCameraDataWorkflow:
             'timestamp': datetime.now(),
             'labels': [{'fog_score': 30, 'fog_level': 'Light Fog', 'confidence': 0.85}]
         }
-        mock_db_manager.get_recent_images.return_value = [recent_image]
+        fake_db_manager.recent_images = [recent_image]
         
         # Step 1: Verify camera exists
         list_response = test_client.get("/api/public/cameras")
         assert list_response.status_code == 200
         
         # Step 2: Get historical data with default period
-        historical_data = []
-        for i in range(5):
-            timestamp = datetime.now() - timedelta(hours=i*4)
-            historical_data.append({
-                'timestamp': timestamp.isoformat() + 'Z',
-                'labels': [{
-                    'fog_score': 40 + i*10,
-                    'fog_level': 'Moderate Fog',
-                    'confidence': 0.8 + i*0.02
-                }]
-            })
-        
-        mock_db_manager.get_recent_images.return_value = historical_data
+        fake_db_manager.recent_images = [
+            {**entry, 'webcam_id': camera_id}
+            for entry in create_camera_history(
+                5, base_score=40, score_step=10, base_confidence=0.8, confidence_step=0.02, hours_step=4
+            )
+        ]
         
         history_response = test_client.get(f"/api/public/cameras/{camera_id}")
         assert history_response.status_code == 200
-        history_data = history_response.json()
+        history_data = json_of(history_response)
         
         assert "history" in history_data
         assert history_data["history_hours"] == 24  # Default
@@ -161,162 +201,138 @@ class TestCameraDataWorkflow:
         # Step 3: Get extended historical data
         extended_response = test_client.get(f"/api/public/cameras/{camera_id}?hours=48")
         assert extended_response.status_code == 200
-        extended_data = extended_response.json()
+        extended_data = json_of(extended_response)
         
         assert extended_data["history_hours"] == 48
 
 class TestWebcamWorkflow:
     """Test webcam-related workflows"""
     
-    @pytest.mark.integration
-    def test_webcam_list_workflow(self, test_client, mock_db_manager):
+    def test_webcam_list_workflow(self, test_client, fake_db_manager):
         """Test webcam list retrieval workflow"""
         # Setup
         webcams = [WebcamFactory() for _ in range(4)]
-        mock_db_manager.get_active_webcams.return_value = webcams
+        fake_db_manager.webcams = webcams
         
         # Execute
         response = test_client.get("/api/public/webcams")
         
         # Assert
         assert response.status_code == 200
-        data = response.json()
+        data = json_of(response)
         
         assert data["count"] == 4
         assert len(data["webcams"]) == 4
         
         # Verify webcam structure
+        required_fields = {'id', 'name', 'lat', 'lon', 'url', 'video_url', 'description', 'active'}
         for webcam in data["webcams"]:
-            required_fields = {'id', 'name', 'lat', 'lon', 'url', 'video_url', 'description', 'active'}
-            assert set(webcam.keys()) == required_fields
+            assert len(webcam) == len(required_fields) and required_fields.issubset(webcam)
 
 class TestSystemStatusWorkflow:
     """Test system status and statistics workflows"""
     
-    @pytest.mark.integration
-    def test_system_monitoring_workflow(self, test_client):
+    def test_system_monitoring_workflow(self, test_client, stats_service, mock_db_ok):
         """Test complete system monitoring workflow"""
         # Step 1: Check basic health
-        health_response = test_client.get("/api/public/")
+        health_response = test_client.get("/")
         assert health_response.status_code == 200
-        health_data = health_response.json()
+        health_data = json_of(health_response)
         assert health_data["status"] == "healthy"
         
         # Step 2: Check comprehensive health with DB
-        with patch('routers.health.get_db_connection'):
-            detailed_health_response = test_client.get("/api/public/health")
-            assert detailed_health_response.status_code == 200
-            detailed_health_data = detailed_health_response.json()
-            assert detailed_health_data["status"] == "healthy"
+        detailed_health_response = test_client.get("/health")
+        assert detailed_health_response.status_code == 200
+        detailed_health_data = json_of(detailed_health_response)
+        assert detailed_health_data["status"] == "healthy"
         
         # Step 3: Get system statistics
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.return_value = {
-                'total_assessments': 1440,
-                'active_cameras': 12,
-                'avg_fog_score': 32.5,
-                'avg_confidence': 0.89,
-                'foggy_conditions': 425,
-                'last_update': '2024-01-10T08:30:00Z',
-                'period': '24 hours'
-            }
-            
-            stats_response = test_client.get("/api/public/stats")
-            assert stats_response.status_code == 200
-            stats_data = stats_response.json()
-            assert stats_data["total_assessments"] == 1440
-            assert stats_data["active_cameras"] == 12
+        stats_service.get_overall_stats.return_value = {
+            'total_assessments': 1440,
+            'active_cameras': 12,
+            'avg_fog_score': 32.5,
+            'avg_confidence': 0.89,
+            'foggy_conditions': 425,
+            'last_update': '2024-01-10T08:30:00Z',
+            'period': '24 hours'
+        }
+        
+        stats_response = test_client.get("/api/stats")
+        assert stats_response.status_code == 200
+        stats_data = json_of(stats_response)
+        assert stats_data["total_assessments"] == 1440
+        assert stats_data["active_cameras"] == 12
         
         # Step 4: Check system status
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = {
-                'karlcam_mode': 0,
-                'description': 'Normal operation',
-                'updated_at': '2024-01-10T08:30:00Z',
-                'updated_by': 'system'
-            }
-            
-            status_response = test_client.get("/api/public/system/status")
-            assert status_response.status_code == 200
-            status_data = status_response.json()
-            assert status_data["karlcam_mode"] == 0
+        stats_service.get_system_status.return_value = {
+            'karlcam_mode': 0,
+            'description': 'Normal operation',
+            'updated_at': '2024-01-10T08:30:00Z',
+            'updated_by': 'system'
+        }
+        
+        status_response = test_client.get("/api/system/status")
+        assert status_response.status_code == 200
+        status_data = json_of(status_response)
+        assert status_data["karlcam_mode"] == 0
     
-    @pytest.mark.integration
-    def test_system_status_update_workflow(self, test_client):
+    def test_system_status_update_workflow(self, test_client, stats_service):
         """Test system status update workflow"""
         # Step 1: Get current status
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = {
-                'karlcam_mode': 0,
-                'description': 'Normal operation',
-                'updated_at': '2024-01-10T08:30:00Z',
-                'updated_by': 'system'
-            }
-            
-            get_response = test_client.get("/api/public/system/status")
-            assert get_response.status_code == 200
-            current_status = get_response.json()
-            assert current_status["karlcam_mode"] == 0
+        stats_service.get_system_status.return_value = {
+            'karlcam_mode': 0,
+            'description': 'Normal operation',
+            'updated_at': '2024-01-10T08:30:00Z',
+            'updated_by': 'system'
+        }
+        
+        get_response = test_client.get("/api/system/status")
+        assert get_response.status_code == 200
+        current_status = json_of(get_response)
+        assert current_status["karlcam_mode"] == 0
         
         # Step 2: Update status
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.set_system_status.return_value = {
-                'success': True,
-                'karlcam_mode': 1,
-                'updated_by': 'admin',
-                'timestamp': '2024-01-10T09:00:00Z'
-            }
-            
-            update_data = {
-                'karlcam_mode': 1,
-                'updated_by': 'admin'
-            }
-            
-            update_response = test_client.post("/api/public/system/status", json=update_data)
-            assert update_response.status_code == 200
-            update_result = update_response.json()
-            assert update_result["success"] is True
-            assert update_result["karlcam_mode"] == 1
+        stats_service.set_system_status.return_value = {
+            'success': True,
+            'karlcam_mode': 1,
+            'updated_by': 'admin',
+            'timestamp': '2024-01-10T09:00:00Z'
+        }
+        
+        update_data = {
+            'karlcam_mode': 1,
+            'updated_by': 'admin'
+        }
+        
+        update_response = test_client.post("/api/system/status", json=update_data)
+        assert update_response.status_code == 200
+        update_result = json_of(update_response)
+        assert update_result["success"] is True
+        assert update_result["karlcam_mode"] == 1
         
         # Step 3: Verify status was updated
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = {
-                'karlcam_mode': 1,
-                'description': 'Night mode - collection paused',
-                'updated_at': '2024-01-10T09:00:00Z',
-                'updated_by': 'admin'
-            }
-            
-            verify_response = test_client.get("/api/public/system/status")
-            assert verify_response.status_code == 200
-            new_status = verify_response.json()
-            assert new_status["karlcam_mode"] == 1
-            assert new_status["updated_by"] == "admin"
+        stats_service.get_system_status.return_value = {
+            'karlcam_mode': 1,
+            'description': 'Night mode - collection paused',
+            'updated_at': '2024-01-10T09:00:00Z',
+            'updated_by': 'admin'
+        }
+        
+        verify_response = test_client.get("/api/system/status")
+        assert verify_response.status_code == 200
+        new_status = json_of(verify_response)
+        assert new_status["karlcam_mode"] == 1
+        assert new_status["updated_by"] == "admin"
 
 class TestConfigurationWorkflow:
     """Test configuration access workflows"""
     
-    @pytest.mark.integration
     def test_public_configuration_workflow(self, test_client):
         """Test public configuration retrieval workflow"""
         # Execute
-        response = test_client.get("/api/public/config/public")
+        config_data = _public_config(test_client)
         
-        # Assert
-        assert response.status_code == 200
-        config_data = response.json()
-        
-        # Verify configuration structure
+        # Assert - verify configuration structure
         required_fields = {
             'app_name', 'version', 'environment', 'fog_detection_threshold',
             'foggy_conditions_threshold', 'default_location', 'default_history_hours',
@@ -338,170 +354,140 @@ class TestConfigurationWorkflow:
 class TestErrorHandlingWorkflows:
     """Test error handling across workflows"""
     
-    @pytest.mark.integration
-    def test_camera_not_found_workflow(self, test_client, mock_db_manager):
+    def test_camera_not_found_workflow(self, test_client, fake_db_manager):
         """Test camera not found error workflow"""
         # Setup - No cameras in database
-        mock_db_manager.get_active_webcams.return_value = []
-        mock_db_manager.get_recent_images.return_value = []
+        fake_db_manager.webcams = []
+        fake_db_manager.recent_images = []
         
         # Step 1: Verify camera doesn't exist in list
         list_response = test_client.get("/api/public/cameras")
         assert list_response.status_code == 200
-        list_data = list_response.json()
+        list_data = json_of(list_response)
         assert list_data["count"] == 0
         
         # Step 2: Try to get details for non-existent camera
         detail_response = test_client.get("/api/public/cameras/nonexistent-camera")
         assert detail_response.status_code == 404
-        detail_data = detail_response.json()
+        detail_data = json_of(detail_response)
         assert "nonexistent-camera" in detail_data["detail"]
         
         # Step 3: Try to get latest image for non-existent camera
         image_response = test_client.get("/api/public/cameras/nonexistent-camera/latest-image")
         assert image_response.status_code == 404
-        image_data = image_response.json()
+        image_data = json_of(image_response)
         assert image_data["error_code"] == "NO_IMAGES_FOUND"
     
-    @pytest.mark.integration
-    def test_validation_error_workflow(self, test_client, mock_db_manager):
+    def test_validation_error_workflow(self, test_client, fake_db_manager):
         """Test validation error workflow"""
         # Setup
         camera_id = "test-camera"
         webcam = WebcamFactory(id=camera_id)
-        mock_db_manager.get_active_webcams.return_value = [webcam]
-        mock_db_manager.get_recent_images.return_value = []
+        fake_db_manager.webcams = [webcam]
+        fake_db_manager.recent_images = []
         
         # Test invalid hours parameter
         invalid_hours_response = test_client.get(f"/api/public/cameras/{camera_id}?hours=-5")
         assert invalid_hours_response.status_code == 422
-        error_data = invalid_hours_response.json()
+        error_data = json_of(invalid_hours_response)
         assert error_data["error_code"] == "VALIDATION_ERROR"
         
         # Test hours over maximum
         over_max_response = test_client.get(f"/api/public/cameras/{camera_id}?hours=200")
         assert over_max_response.status_code == 422
-        error_data = over_max_response.json()
+        error_data = json_of(over_max_response)
         assert error_data["error_code"] == "VALIDATION_ERROR"
     
-    @pytest.mark.integration
-    def test_service_error_workflow(self, test_client, mock_db_manager):
+    def test_service_error_workflow(self, test_client, fake_db_manager, stats_service):
         """Test service error handling workflow"""
         # Step 1: Test database error in camera list
-        mock_db_manager.get_recent_images.side_effect = Exception("Database connection failed")
+        fake_db_manager.recent_images_error = Exception("Database connection failed")
         
         list_response = test_client.get("/api/public/cameras")
         assert list_response.status_code == 500
-        list_data = list_response.json()
-        assert list_data["error_code"] == "INTERNAL_ERROR"
+        list_data = json_of(list_response)
+        assert list_data["error_code"] == "PROCESSING_ERROR"  # CameraService wraps it in DataProcessingError
         
         # Step 2: Test stats service error
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.side_effect = Exception("Stats calculation failed")
-            
-            stats_response = test_client.get("/api/public/stats")
-            assert stats_response.status_code == 500
-            stats_data = stats_response.json()
-            assert stats_data["error_code"] == "INTERNAL_ERROR"
+        stats_service.get_overall_stats.side_effect = Exception("Stats calculation failed")
+        
+        stats_response = test_client.get("/api/stats")
+        assert stats_response.status_code == 500
+        stats_data = json_of(stats_response)
+        assert stats_data["error_code"] == "INTERNAL_ERROR"
 
 class TestImageServingWorkflow:
     """Test image serving workflows"""
     
-    @pytest.mark.integration
-    def test_image_serving_workflow(self, test_client):
+    def test_image_serving_workflow(self, test_client, image_service_mock):
         """Test complete image serving workflow"""
         # Setup
         filename = "test-camera_2024-01-10T08-30-00Z.jpg"
         expected_url = f"https://storage.googleapis.com/karlcam-fog-data/raw_images/{filename}"
         
-        with patch('routers.images.ImageService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_image_url.return_value = expected_url
-            
-            # Execute
-            response = test_client.get(f"/api/public/images/{filename}", allow_redirects=False)
-            
-            # Assert
-            assert response.status_code == 302
-            assert response.headers['location'] == expected_url
-            assert response.headers['cache-control'] == "public, max-age=3600"
+        image_service_mock.get_image_url.return_value = expected_url
+        
+        # Execute
+        response = test_client.get(f"/api/images/{filename}", follow_redirects=False)
+        
+        # Assert
+        assert response.status_code == 307
+        assert response.headers['location'] == expected_url
+        assert response.headers['cache-control'] == "public, max-age=3600"
 
 class TestEndToEndScenarios:
     """Test complete end-to-end scenarios"""
     
-    @pytest.mark.integration
-    def test_typical_client_usage_scenario(self, test_client, mock_db_manager):
+    def test_typical_client_usage_scenario(self, test_client, fake_db_manager, stats_service):
         """Test typical client application usage scenario"""
         # Scenario: A web client loading the KarlCam dashboard
         
         # Step 1: Client gets public configuration
-        config_response = test_client.get("/api/public/config/public")
-        assert config_response.status_code == 200
-        config = config_response.json()
+        config = _public_config(test_client)
         fog_threshold = config["fog_detection_threshold"]
         
         # Step 2: Client gets list of all cameras
-        cameras, images_by_camera = create_multi_camera_scenario(num_cameras=5)
-        mock_db_manager.get_active_webcams.return_value = cameras
-        
-        all_images = []
-        for images in images_by_camera.values():
-            all_images.extend(images)
-        mock_db_manager.get_recent_images.return_value = all_images
+        fake_db_manager.webcams = _DASHBOARD_CAMERAS
+        fake_db_manager.recent_images = _DASHBOARD_IMAGES
         
         cameras_response = test_client.get("/api/public/cameras")
         assert cameras_response.status_code == 200
-        cameras_data = cameras_response.json()
+        cameras_data = json_of(cameras_response)
         assert cameras_data["count"] == 5
         
         # Step 3: Client gets system statistics for dashboard
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.return_value = {
-                'total_assessments': 2880,
-                'active_cameras': 5,
-                'avg_fog_score': 45.2,
-                'avg_confidence': 0.87,
-                'foggy_conditions': 850,
-                'last_update': '2024-01-10T08:30:00Z',
-                'period': '24 hours'
-            }
-            
-            stats_response = test_client.get("/api/public/stats")
-            assert stats_response.status_code == 200
-            stats_data = stats_response.json()
-            
-            # Verify stats make sense given the configuration
-            foggy_cameras = [c for c in cameras_data["cameras"] if c["fog_score"] > fog_threshold]
-            assert stats_data["active_cameras"] == 5
+        stats_service.get_overall_stats.return_value = {
+            'total_assessments': 2880,
+            'active_cameras': 5,
+            'avg_fog_score': 45.2,
+            'avg_confidence': 0.87,
+            'foggy_conditions': 850,
+            'last_update': '2024-01-10T08:30:00Z',
+            'period': '24 hours'
+        }
+        
+        stats_response = test_client.get("/api/stats")
+        assert stats_response.status_code == 200
+        stats_data = json_of(stats_response)
+        
+        # Verify stats make sense given the configuration
+        foggy_cameras = [c for c in cameras_data["cameras"] if c["fog_score"] > fog_threshold]
+        assert stats_data["active_cameras"] == 5
         
         # Step 4: Client gets detailed view of a high-fog camera
         high_fog_camera = max(cameras_data["cameras"], key=lambda c: c["fog_score"])
         camera_id = high_fog_camera["id"]
         
         # Mock historical data for this camera
-        mock_db_manager.get_recent_images.return_value = [
-            {
-                'timestamp': (datetime.now() - timedelta(hours=i)).isoformat() + 'Z',
-                'labels': [{
-                    'fog_score': 70 - i*5,
-                    'fog_level': 'Heavy Fog' if (70 - i*5) > 60 else 'Moderate Fog',
-                    'confidence': 0.9 - i*0.01
-                }]
-            } for i in range(6)
-        ]
+        fake_db_manager.recent_images = [{**entry, 'webcam_id': camera_id} for entry in _DASHBOARD_HISTORY]
         
         detail_response = test_client.get(f"/api/public/cameras/{camera_id}")
         assert detail_response.status_code == 200
-        detail_data = detail_response.json()
+        detail_data = json_of(detail_response)
         assert len(detail_data["history"]) == 6
         
         # Step 5: Client gets latest image for display
-        mock_db_manager.get_recent_images.return_value = [
+        fake_db_manager.recent_images = [
             {
                 'timestamp': datetime.now(),
                 'image_filename': f'{camera_id}_latest.jpg',
@@ -511,6 +497,6 @@ class TestEndToEndScenarios:
         
         image_response = test_client.get(f"/api/public/cameras/{camera_id}/latest-image")
         assert image_response.status_code == 200
-        image_data = image_response.json()
+        image_data = json_of(image_response)
         assert "image_url" in image_data
         assert image_data["camera_id"] == camera_id
\ No newline at end of file
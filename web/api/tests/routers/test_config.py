@@ -2,7 +2,63 @@
 Unit tests for Config Router endpoints
 """
 import pytest
-from unittest.mock import patch
+from types import SimpleNamespace
+
+from web.api.main import app
+from web.api.core.config import get_settings
+from web.api.routers.config import get_full_config, get_public_config
+
+# Every setting the /full route reads, with development-environment values
+_FULL_SETTINGS_DICT = {
+    'APP_NAME': 'KarlCam Fog API',
+    'VERSION': '2.0.0',
+    'ENVIRONMENT': 'test',
+    'DEBUG': True,
+    'API_PREFIX': '/api',
+    'FOG_DETECTION_THRESHOLD': 20,
+    'FOGGY_CONDITIONS_THRESHOLD': 50,
+    'DEFAULT_LATITUDE': 37.7749,
+    'DEFAULT_LONGITUDE': -122.4194,
+    'DEFAULT_LOCATION_NAME': 'San Francisco',
+    'RECENT_IMAGES_DAYS': 1,
+    'CAMERA_HISTORY_DAYS': 30,
+    'DEFAULT_HISTORY_HOURS': 24,
+    'STATS_PERIOD_HOURS': 24,
+    'DB_POOL_MIN_CONN': 1,
+    'DB_POOL_MAX_CONN': 10,
+    'DB_POOL_TIMEOUT': 30,
+    'BUCKET_NAME': 'test-bucket',
+    'GCS_TIMEOUT': 60,
+    'CORS_ORIGINS': ['*'],
+    'CORS_ALLOW_CREDENTIALS': True,
+    'CORS_ALLOWED_METHODS': ['*'],
+    'CORS_ALLOWED_HEADERS': ['*'],
+}
+
+# Public config fields and the JSON types they must decode to
+_PUBLIC_CONFIG_TYPES = {
+    'app_name': str,
+    'version': str,
+    'environment': str,
+    'fog_detection_threshold': int,
+    'foggy_conditions_threshold': int,
+    'default_location': dict,
+    'default_history_hours': int,
+    'stats_period_hours': int,
+    'api_prefix': str,
+}
+
+_LOCATION_TYPES = {
+    'name': str,
+    'latitude': (int, float),
+    'longitude': (int, float),
+}
+
+@pytest.fixture
+def full_settings():
+    """Development settings for get_settings overrides, removed on teardown"""
+    yield SimpleNamespace(**_FULL_SETTINGS_DICT, is_production=False)
+    app.dependency_overrides.pop(get_settings, None)
 
 class TestConfigEndpoints:
     """Test suite for config router endpoints"""
@@ -11,45 +67,28 @@ class TestConfigEndpoints:
     def test_get_public_config_success(self, test_client):
         """Test successful public config retrieval"""
         # Execute
-        response = test_client.get("/api/public/config/public")
+        response = test_client.get("/api/config/public")
         
         # Assert
         assert response.status_code == 200
         data = response.json()
         
-        # Validate required fields
-        required_fields = {
-            'app_name', 'version', 'environment', 'fog_detection_threshold',
-            'foggy_conditions_threshold', 'default_location', 'default_history_hours',
-            'stats_period_hours', 'api_prefix'
-        }
-        assert set(data.keys()) == required_fields
+        # Validate required fields and their types
+        assert data.keys() == _PUBLIC_CONFIG_TYPES.keys()
+        for field, expected_type in _PUBLIC_CONFIG_TYPES.items():
+            assert isinstance(data[field], expected_type), field
         
         # Validate default location structure
         location = data['default_location']
-        assert 'name' in location
-        assert 'latitude' in location
-        assert 'longitude' in location
-        
-        # Validate field types
-        assert isinstance(data['app_name'], str)
-        assert isinstance(data['version'], str)
-        assert isinstance(data['environment'], str)
-        assert isinstance(data['fog_detection_threshold'], int)
-        assert isinstance(data['foggy_conditions_threshold'], int)
-        assert isinstance(data['default_history_hours'], int)
-        assert isinstance(data['stats_period_hours'], int)
-        assert isinstance(data['api_prefix'], str)
-        
-        assert isinstance(location['name'], str)
-        assert isinstance(location['latitude'], (int, float))
-        assert isinstance(location['longitude'], (int, float))
+        assert location.keys() == _LOCATION_TYPES.keys()
+        for field, expected_type in _LOCATION_TYPES.items():
+            assert isinstance(location[field], expected_type), field
     
     @pytest.mark.unit
     def test_get_public_config_values(self, test_client):
         """Test that public config returns expected values"""
         # Execute
-        response = test_client.get("/api/public/config/public")
+        response = test_client.get("/api/config/public")
         
         # Assert
         assert response.status_code == 200
@@ -74,7 +113,7 @@ class TestConfigEndpoints:
     def test_get_public_config_no_sensitive_data(self, test_client):
         """Test that public config doesn't expose sensitive data"""
         # Execute
-        response = test_client.get("/api/public/config/public")
+        response = test_client.get("/api/config/public")
         
         # Assert
         assert response.status_code == 200
@@ -90,214 +129,88 @@ class TestConfigEndpoints:
             assert field not in data, f"Sensitive field '{field}' found in public config"
     
     @pytest.mark.unit 
-    def test_get_full_config_in_production(self, test_client):
+    def test_get_full_config_in_production(self, test_client, full_settings):
         """Test that full config is blocked in production environment"""
-        # Setup - Mock production environment
-        with patch('routers.config.settings') as mock_settings:
-            mock_settings.is_production = True
-            
-            # Execute
-            response = test_client.get("/api/public/config/full")
-            
-            # Assert
-            assert response.status_code == 403
-            data = response.json()
-            assert "not available in production" in data['detail']
+        # Setup - Production environment
+        full_settings.is_production = True
+        app.dependency_overrides[get_settings] = lambda: full_settings
+        
+        # Execute
+        response = test_client.get("/api/config/full")
+        
+        # Assert
+        assert response.status_code == 403
+        data = response.json()
+        assert "not available in production" in data['detail']
     
     @pytest.mark.unit
-    def test_get_full_config_in_development(self, test_client):
+    def test_get_full_config_in_development(self, test_client, full_settings):
         """Test full config access in development environment"""
-        # Setup - Mock development environment
-        with patch('routers.config.settings') as mock_settings:
-            # Set up mock settings with all required attributes
-            mock_settings.is_production = False
-            mock_settings.APP_NAME = 'KarlCam Fog API'
-            mock_settings.VERSION = '2.0.0'
-            mock_settings.ENVIRONMENT = 'test'
-            mock_settings.DEBUG = True
-            mock_settings.API_PREFIX = '/api'
-            mock_settings.FOG_DETECTION_THRESHOLD = 20
-            mock_settings.FOGGY_CONDITIONS_THRESHOLD = 50
-            mock_settings.DEFAULT_LATITUDE = 37.7749
-            mock_settings.DEFAULT_LONGITUDE = -122.4194
-            mock_settings.DEFAULT_LOCATION_NAME = 'San Francisco'
-            mock_settings.RECENT_IMAGES_DAYS = 1
-            mock_settings.CAMERA_HISTORY_DAYS = 30
-            mock_settings.DEFAULT_HISTORY_HOURS = 24
-            mock_settings.STATS_PERIOD_HOURS = 24
-            mock_settings.DB_POOL_MIN_CONN = 1
-            mock_settings.DB_POOL_MAX_CONN = 10
-            mock_settings.DB_POOL_TIMEOUT = 30
-            mock_settings.BUCKET_NAME = 'test-bucket'
-            mock_settings.GCS_TIMEOUT = 60
-            mock_settings.CORS_ORIGINS = ['*']
-            mock_settings.CORS_ALLOW_CREDENTIALS = True
-            mock_settings.CORS_ALLOWED_METHODS = ['*']
-            mock_settings.CORS_ALLOWED_HEADERS = ['*']
-            
-            # Execute
-            response = test_client.get("/api/public/config/full")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Validate comprehensive config fields
-            assert 'app_name' in data
-            assert 'version' in data
-            assert 'environment' in data
-            assert 'debug' in data
-            assert 'fog_detection_threshold' in data
-            assert 'db_pool_min_conn' in data
-            assert 'bucket_name' in data
-            assert 'cors_origins' in data
-    
-    @pytest.mark.unit
-    def test_get_full_config_includes_database_settings(self, test_client):
-        """Test that full config includes database configuration"""
-        # Setup
-        with patch('routers.config.settings') as mock_settings:
-            mock_settings.is_production = False
-            mock_settings.DB_POOL_MIN_CONN = 2
-            mock_settings.DB_POOL_MAX_CONN = 20
-            mock_settings.DB_POOL_TIMEOUT = 45
-            # Set other required attributes
-            for attr in ['APP_NAME', 'VERSION', 'ENVIRONMENT', 'DEBUG', 'API_PREFIX',
-                        'FOG_DETECTION_THRESHOLD', 'FOGGY_CONDITIONS_THRESHOLD',
-                        'DEFAULT_LATITUDE', 'DEFAULT_LONGITUDE', 'DEFAULT_LOCATION_NAME',
-                        'RECENT_IMAGES_DAYS', 'CAMERA_HISTORY_DAYS', 'DEFAULT_HISTORY_HOURS',
-                        'STATS_PERIOD_HOURS', 'BUCKET_NAME', 'GCS_TIMEOUT',
-                        'CORS_ORIGINS', 'CORS_ALLOW_CREDENTIALS', 'CORS_ALLOWED_METHODS',
-                        'CORS_ALLOWED_HEADERS']:
-                setattr(mock_settings, attr, 'test_value')
-            
-            # Execute
-            response = test_client.get("/api/public/config/full")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['db_pool_min_conn'] == 2
-            assert data['db_pool_max_conn'] == 20
-            assert data['db_pool_timeout'] == 45
-    
-    @pytest.mark.unit
-    def test_get_full_config_includes_gcs_settings(self, test_client):
-        """Test that full config includes GCS configuration"""
-        # Setup
-        with patch('routers.config.settings') as mock_settings:
-            mock_settings.is_production = False
-            mock_settings.BUCKET_NAME = 'karlcam-test-bucket'
-            mock_settings.GCS_TIMEOUT = 120
-            # Set other required attributes
-            for attr in ['APP_NAME', 'VERSION', 'ENVIRONMENT', 'DEBUG', 'API_PREFIX',
-                        'FOG_DETECTION_THRESHOLD', 'FOGGY_CONDITIONS_THRESHOLD',
-                        'DEFAULT_LATITUDE', 'DEFAULT_LONGITUDE', 'DEFAULT_LOCATION_NAME',
-                        'RECENT_IMAGES_DAYS', 'CAMERA_HISTORY_DAYS', 'DEFAULT_HISTORY_HOURS',
-                        'STATS_PERIOD_HOURS', 'DB_POOL_MIN_CONN', 'DB_POOL_MAX_CONN',
-                        'DB_POOL_TIMEOUT', 'CORS_ORIGINS', 'CORS_ALLOW_CREDENTIALS',
-                        'CORS_ALLOWED_METHODS', 'CORS_ALLOWED_HEADERS']:
-                setattr(mock_settings, attr, 'test_value')
-            
-            # Execute
-            response = test_client.get("/api/public/config/full")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['bucket_name'] == 'karlcam-test-bucket'
-            assert data['gcs_timeout'] == 120
+        # Setup - Development environment
+        app.dependency_overrides[get_settings] = lambda: full_settings
+        
+        # Execute
+        response = test_client.get("/api/config/full")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Validate comprehensive config fields
+        assert 'app_name' in data
+        assert 'version' in data
+        assert 'environment' in data
+        assert 'debug' in data
+        assert 'fog_detection_threshold' in data
+        assert 'db_pool_min_conn' in data
+        assert 'bucket_name' in data
+        assert 'cors_origins' in data
     
     @pytest.mark.unit
-    def test_get_full_config_includes_cors_settings(self, test_client):
-        """Test that full config includes CORS configuration"""
+    def test_full_config_includes_all_infra_settings(self, test_client, full_settings):
+        """Test that full config reports the database, GCS and CORS settings"""
         # Setup
-        with patch('routers.config.settings') as mock_settings:
-            mock_settings.is_production = False
-            mock_settings.CORS_ORIGINS = ['http://localhost:3000', 'https://karlcam.org']
-            mock_settings.CORS_ALLOW_CREDENTIALS = False
-            mock_settings.CORS_ALLOWED_METHODS = ['GET', 'POST']
-            mock_settings.CORS_ALLOWED_HEADERS = ['Content-Type', 'Authorization']
-            # Set other required attributes
-            for attr in ['APP_NAME', 'VERSION', 'ENVIRONMENT', 'DEBUG', 'API_PREFIX',
-                        'FOG_DETECTION_THRESHOLD', 'FOGGY_CONDITIONS_THRESHOLD',
-                        'DEFAULT_LATITUDE', 'DEFAULT_LONGITUDE', 'DEFAULT_LOCATION_NAME',
-                        'RECENT_IMAGES_DAYS', 'CAMERA_HISTORY_DAYS', 'DEFAULT_HISTORY_HOURS',
-                        'STATS_PERIOD_HOURS', 'DB_POOL_MIN_CONN', 'DB_POOL_MAX_CONN',
-                        'DB_POOL_TIMEOUT', 'BUCKET_NAME', 'GCS_TIMEOUT']:
-                setattr(mock_settings, attr, 'test_value')
-            
-            # Execute
-            response = test_client.get("/api/public/config/full")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['cors_origins'] == ['http://localhost:3000', 'https://karlcam.org']
-            assert data['cors_allow_credentials'] is False
-            assert data['cors_allowed_methods'] == ['GET', 'POST']
-            assert data['cors_allowed_headers'] == ['Content-Type', 'Authorization']
-    
-    @pytest.mark.unit
-    def test_config_endpoints_consistency(self, test_client):
-        """Test that public and full config share consistent values"""
-        # Get public config
-        public_response = test_client.get("/api/public/config/public")
-        assert public_response.status_code == 200
-        public_data = public_response.json()
+        full_settings.DB_POOL_MIN_CONN = 2
+        full_settings.DB_POOL_MAX_CONN = 20
+        full_settings.DB_POOL_TIMEOUT = 45
+        full_settings.BUCKET_NAME = 'karlcam-test-bucket'
+        full_settings.GCS_TIMEOUT = 120
+        full_settings.CORS_ORIGINS = ['http://localhost:3000', 'https://karlcam.org']
+        full_settings.CORS_ALLOW_CREDENTIALS = False
+        full_settings.CORS_ALLOWED_METHODS = ['GET', 'POST']
+        full_settings.CORS_ALLOWED_HEADERS = ['Content-Type', 'Authorization']
+        app.dependency_overrides[get_settings] = lambda: full_settings
         
-        # Get full config (in test environment)
-        with patch('routers.config.settings') as mock_settings:
-            mock_settings.is_production = False
-            # Copy values from public config to ensure consistency
-            mock_settings.APP_NAME = public_data['app_name']
-            mock_settings.VERSION = public_data['version']
-            mock_settings.ENVIRONMENT = public_data['environment']
-            mock_settings.FOG_DETECTION_THRESHOLD = public_data['fog_detection_threshold']
-            mock_settings.API_PREFIX = public_data['api_prefix']
-            # Set other required attributes
-            for attr in ['DEBUG', 'FOGGY_CONDITIONS_THRESHOLD', 'DEFAULT_LATITUDE',
-                        'DEFAULT_LONGITUDE', 'DEFAULT_LOCATION_NAME', 'RECENT_IMAGES_DAYS',
-                        'CAMERA_HISTORY_DAYS', 'DEFAULT_HISTORY_HOURS', 'STATS_PERIOD_HOURS',
-                        'DB_POOL_MIN_CONN', 'DB_POOL_MAX_CONN', 'DB_POOL_TIMEOUT',
-                        'BUCKET_NAME', 'GCS_TIMEOUT', 'CORS_ORIGINS', 'CORS_ALLOW_CREDENTIALS',
-                        'CORS_ALLOWED_METHODS', 'CORS_ALLOWED_HEADERS']:
-                setattr(mock_settings, attr, 'test_value')
-            
-            full_response = test_client.get("/api/public/config/full")
-            assert full_response.status_code == 200
-            full_data = full_response.json()
-            
-            # Check that shared fields have consistent values
-            shared_fields = ['app_name', 'version', 'environment', 'fog_detection_threshold', 'api_prefix']
-            for field in shared_fields:
-                assert public_data[field] == full_data[field], f"Inconsistent value for {field}"
-    
-    @pytest.mark.unit
-    def test_public_config_response_format(self, test_client):
-        """Test that public config response format is stable"""
         # Execute
-        response = test_client.get("/api/public/config/public")
+        response = test_client.get("/api/config/full")
         
         # Assert
         assert response.status_code == 200
         data = response.json()
         
-        # Validate that all expected fields are present and have correct types
-        assert isinstance(data.get('app_name'), str)
-        assert isinstance(data.get('version'), str)  
-        assert isinstance(data.get('environment'), str)
-        assert isinstance(data.get('fog_detection_threshold'), int)
-        assert isinstance(data.get('foggy_conditions_threshold'), int)
-        assert isinstance(data.get('default_history_hours'), int)
-        assert isinstance(data.get('stats_period_hours'), int)
-        assert isinstance(data.get('api_prefix'), str)
+        # Database
+        assert data['db_pool_min_conn'] == 2
+        assert data['db_pool_max_conn'] == 20
+        assert data['db_pool_timeout'] == 45
+        
+        # GCS
+        assert data['bucket_name'] == 'karlcam-test-bucket'
+        assert data['gcs_timeout'] == 120
+        
+        # CORS
+        assert data['cors_origins'] == ['http://localhost:3000', 'https://karlcam.org']
+        assert data['cors_allow_credentials'] is False
+        assert data['cors_allowed_methods'] == ['GET', 'POST']
+        assert data['cors_allowed_headers'] == ['Content-Type', 'Authorization']
+    
+    @pytest.mark.unit
+    async def test_config_endpoints_consistency(self, full_settings):
+        """Test that public and full config share consistent values"""
+        # Execute - call the route handlers directly; both read the same settings
+        public_data = (await get_public_config(settings=full_settings)).model_dump()
+        full_data = (await get_full_config(settings=full_settings)).model_dump()
         
-        # Validate default_location structure
-        location = data.get('default_location', {})
-        assert isinstance(location.get('name'), str)
-        assert isinstance(location.get('latitude'), (int, float))
-        assert isinstance(location.get('longitude'), (int, float))
\ No newline at end of file
+        # Check that shared fields have consistent values
+        shared_fields = ['app_name', 'version', 'environment', 'fog_detection_threshold', 'api_prefix']
+        for field in shared_fields:
+            assert public_data[field] == full_data[field], f"Inconsistent value for {field}"
\ No newline at end of file
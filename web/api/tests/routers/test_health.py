@@ -1,18 +1,37 @@
 """
 Unit tests for Health Router endpoints
 """
+import asyncio
+import threading
+import time
+
+import freezegun
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from psycopg2.pool import PoolError
+from types import SimpleNamespace
+
+from web.api.routers import health as health_router
+
+@pytest.fixture(autouse=True)
+def reset_last_ok(monkeypatch):
+    """Start every test without a remembered healthy /health result"""
+    monkeypatch.setattr(health_router, "_last_ok", None)
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Freeze wall-clock time at 2024-01-01"""
+    monkeypatch.setattr(health_router, "_root_cache", None)
+    with freezegun.freeze_time("2024-01-01T00:00:00", real_asyncio=True):
+        yield
 
 class TestHealthEndpoints:
     """Test suite for health router endpoints"""
     
     @pytest.mark.unit
-    def test_root_health_check_success(self, test_client):
+    async def test_root_health_check_success(self, async_test_client, frozen_clock):
         """Test basic health check endpoint"""
         # Execute
-        response = test_client.get("/api/public/")
+        response = await async_test_client.get("/")
         
         # Assert
         assert response.status_code == 200
@@ -21,106 +40,223 @@ class TestHealthEndpoints:
         assert data['status'] == 'healthy'
         assert data['service'] == 'KarlCam Fog API'
         assert data['version'] == '2.0.0'
-        assert 'timestamp' in data
+        assert data['timestamp'].startswith("2024-01-01")
+    
+    @pytest.mark.unit
+    async def test_root_health_cache_hit(self, async_test_client, monkeypatch):
+        """Test that the root payload is served from cache within the TTL"""
+        # Setup
+        monkeypatch.setattr(health_router, "_root_cache", None)
+        monkeypatch.setattr(health_router, "time", SimpleNamespace(monotonic=lambda: 1000.0))
         
-        # Validate timestamp format
-        timestamp = data['timestamp']
-        try:
-            datetime.fromisoformat(timestamp)
-        except ValueError:
-            pytest.fail(f"Invalid timestamp format: {timestamp}")
+        # Execute
+        first = await async_test_client.get("/")
+        second = await async_test_client.get("/")
+        
+        # Assert
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/json"
+        assert first.content == second.content
     
     @pytest.mark.unit
-    def test_health_endpoint_with_database_success(self, test_client):
+    async def test_health_endpoint_with_database_success(self, async_test_client, mock_db_ok):
         """Test comprehensive health check with successful database connection"""
-        # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_connection = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db_connection.return_value.__enter__.return_value = mock_connection
-            mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['status'] == 'healthy'
-            assert data['database'] == 'connected'
-            assert 'timestamp' in data
-            
-            # Verify database query was executed
-            mock_cursor.execute.assert_called_once_with("SELECT 1")
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'healthy'
+        assert data['database'] == 'connected'
+        assert 'timestamp' in data
+        
+        # Verify database query was executed
+        mock_db_ok.execute.assert_called_once_with("SELECT 1")
     
     @pytest.mark.unit
-    def test_health_endpoint_with_database_failure(self, test_client):
+    async def test_health_endpoint_with_database_failure(self, async_test_client, mock_db_fail):
         """Test comprehensive health check with database connection failure"""
         # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_get_db_connection.side_effect = Exception("Database connection failed")
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200  # Still returns 200, but degraded status
-            data = response.json()
-            
-            assert data['status'] == 'degraded'
-            assert data['database'] == 'disconnected'
-            assert 'error' in data
-            assert 'Database connection failed' in data['error']
-            assert 'timestamp' in data
+        mock_db_fail(Exception("Database connection failed"))
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200  # Still returns 200, but degraded status
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'error' in data
+        assert 'Database connection failed' in data['error']
+        assert 'timestamp' in data
     
     @pytest.mark.unit
-    def test_health_endpoint_with_database_timeout(self, test_client):
+    async def test_health_endpoint_with_database_timeout(self, async_test_client, mock_db_fail):
         """Test health check with database timeout"""
         # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_get_db_connection.side_effect = TimeoutError("Connection timeout")
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['status'] == 'degraded'
-            assert data['database'] == 'disconnected'
-            assert 'timeout' in data['error'].lower()
+        mock_db_fail(TimeoutError("Connection timeout"))
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'timeout' in data['error'].lower()
     
     @pytest.mark.unit
-    def test_health_endpoint_with_database_cursor_error(self, test_client):
-        """Test health check with database cursor error"""
+    async def test_health_endpoint_with_pool_exhausted(self, async_test_client, mock_db_fail):
+        """Test that an exhausted connection pool reports degraded without waiting"""
         # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_connection = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db_connection.return_value.__enter__.return_value = mock_connection
-            mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
-            
-            # Make cursor.execute fail
-            mock_cursor.execute.side_effect = Exception("SQL execution failed")
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['status'] == 'degraded'
-            assert data['database'] == 'disconnected'
-            assert 'SQL execution failed' in data['error']
+        mock_db_fail(PoolError("connection pool exhausted"))
+        
+        # Execute
+        start = time.monotonic()
+        response = await async_test_client.get("/health")
+        elapsed = time.monotonic() - start
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'pool exhausted' in data['error']
+        assert elapsed < health_router.settings.DB_HEALTH_CHECK_TIMEOUT
+    
+    @pytest.mark.unit
+    async def test_health_endpoint_with_slow_database_probe(self, async_test_client, monkeypatch):
+        """Test that a hanging database probe is cut off at the health timeout"""
+        # Setup - the probe blocks until released, like a driver stuck connecting
+        release = threading.Event()
+        monkeypatch.setattr(health_router, "CHECKS", [("database", lambda: release.wait(10))])
+        monkeypatch.setattr(health_router.settings, "DB_HEALTH_CHECK_TIMEOUT", 0.2)
+        
+        # Execute
+        start = time.monotonic()
+        try:
+            response = await async_test_client.get("/health")
+        finally:
+            release.set()
+        elapsed = time.monotonic() - start
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'timeout' in data['error'].lower()
+        assert elapsed < 1.0
     
     @pytest.mark.unit
-    def test_root_health_response_format(self, test_client):
+    async def test_health_parallel_fanout(self, async_test_client, monkeypatch):
+        """Test that subsystem probes run concurrently rather than one after another"""
+        # Setup - two probes of 0.5s each would take 1.0s+ if run serially
+        slow_probe = lambda: time.sleep(0.5)
+        monkeypatch.setattr(health_router, "CHECKS", [("database", slow_probe), ("storage", slow_probe)])
+        
+        # Execute
+        start = time.monotonic()
+        response = await async_test_client.get("/health")
+        elapsed = time.monotonic() - start
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.json()['database'] == 'connected'
+        assert elapsed < 0.8
+    
+    @pytest.mark.unit
+    async def test_health_endpoint_serves_stale_result(self, async_test_client, mock_db_ok, mock_db_fail):
+        """Test that a recent healthy result is replayed as stale while the database fails"""
+        # Setup - prime the fallback with a healthy check
+        primed = (await async_test_client.get("/health")).json()
+        mock_db_fail(Exception("Database connection failed"))
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'db_latency_ms' not in data
+        assert data['stale'] is True
+        assert data['timestamp'] == primed['timestamp']
+        assert 'Database connection failed' in data['error']
+        mock_db_ok.execute.assert_called_once_with("SELECT 1")
+
+    @pytest.mark.unit
+    async def test_health_endpoint_does_not_replay_slow_result(self, async_test_client, mock_db_ok, mock_db_fail):
+        """Test that a warning or degraded result is never replayed as the stale fallback"""
+        # Setup - a slow but reachable database reports degraded
+        mock_db_ok.execute.side_effect = lambda query: time.sleep(0.15)
+        assert (await async_test_client.get("/health")).json()['status'] == 'degraded'
+        mock_db_fail(Exception("Database connection failed"))
+
+        # Execute
+        response = await async_test_client.get("/health")
+
+        # Assert
+        data = response.json()
+
+        assert data['status'] == 'degraded'
+        assert 'stale' not in data
+        assert 'Database connection failed' in data['error']
+        assert health_router._last_ok is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("delay,expected_status", [
+        (0.05, "warning"),
+        (0.15, "degraded"),
+    ])
+    async def test_health_latency_bands(self, async_test_client, mock_db_ok, delay, expected_status):
+        """Test that a slow but reachable database is banded by probe latency"""
+        # Setup
+        mock_db_ok.execute.side_effect = lambda query: time.sleep(delay)
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == expected_status
+        assert data['database'] == 'connected'
+        assert data['db_latency_ms'] >= delay * 1000
+    
+    @pytest.mark.unit
+    async def test_health_endpoint_with_database_cursor_error(self, async_test_client, mock_db_ok):
+        """Test health check with database cursor error"""
+        # Setup - make cursor.execute fail
+        mock_db_ok.execute.side_effect = Exception("SQL execution failed")
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
+        assert 'SQL execution failed' in data['error']
+    
+    @pytest.mark.unit
+    async def test_root_health_response_format(self, async_test_client):
         """Test that root health response matches expected schema"""
         # Execute
-        response = test_client.get("/api/public/")
+        response = await async_test_client.get("/")
         
         # Assert
         assert response.status_code == 200
@@ -128,7 +264,7 @@ class TestHealthEndpoints:
         
         # Validate required fields
         required_fields = {'status', 'service', 'version', 'timestamp'}
-        assert set(data.keys()) == required_fields
+        assert data.keys() == required_fields
         
         # Validate field types
         assert isinstance(data['status'], str)
@@ -142,86 +278,70 @@ class TestHealthEndpoints:
         assert data['version'] == '2.0.0'
     
     @pytest.mark.unit
-    def test_comprehensive_health_response_format_success(self, test_client):
+    async def test_comprehensive_health_response_format_success(self, async_test_client, mock_db_ok):
         """Test comprehensive health response format when healthy"""
-        # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_connection = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db_connection.return_value.__enter__.return_value = mock_connection
-            mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Validate required fields for healthy response
-            required_fields = {'status', 'database', 'timestamp'}
-            assert set(data.keys()) == required_fields
-            
-            # Validate field types
-            assert isinstance(data['status'], str)
-            assert isinstance(data['database'], str)
-            assert isinstance(data['timestamp'], str)
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Validate required fields for healthy response
+        required_fields = {'status', 'database', 'db_latency_ms', 'timestamp'}
+        assert data.keys() == required_fields
+        
+        # Validate field types
+        assert isinstance(data['status'], str)
+        assert isinstance(data['database'], str)
+        assert isinstance(data['db_latency_ms'], float)
+        assert isinstance(data['timestamp'], str)
     
     @pytest.mark.unit
-    def test_comprehensive_health_response_format_degraded(self, test_client):
+    async def test_comprehensive_health_response_format_degraded(self, async_test_client, mock_db_fail):
         """Test comprehensive health response format when degraded"""
         # Setup
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_get_db_connection.side_effect = Exception("Database error")
-            
-            # Execute
-            response = test_client.get("/api/public/health")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Validate required fields for degraded response
-            required_fields = {'status', 'database', 'error', 'timestamp'}
-            assert set(data.keys()) == required_fields
-            
-            # Validate field types
-            assert isinstance(data['status'], str)
-            assert isinstance(data['database'], str)
-            assert isinstance(data['error'], str)
-            assert isinstance(data['timestamp'], str)
-            
-            # Validate values
-            assert data['status'] == 'degraded'
-            assert data['database'] == 'disconnected'
+        mock_db_fail(Exception("Database error"))
+        
+        # Execute
+        response = await async_test_client.get("/health")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Validate required fields for degraded response
+        required_fields = {'status', 'database', 'error', 'timestamp'}
+        assert data.keys() == required_fields
+        
+        # Validate field types
+        assert isinstance(data['status'], str)
+        assert isinstance(data['database'], str)
+        assert isinstance(data['error'], str)
+        assert isinstance(data['timestamp'], str)
+        
+        # Validate values
+        assert data['status'] == 'degraded'
+        assert data['database'] == 'disconnected'
     
     @pytest.mark.unit
-    def test_health_endpoints_performance(self, test_client):
+    async def test_health_endpoints_performance(self, async_test_client, mock_db_ok):
         """Test that health endpoints respond quickly"""
         # This is more of a smoke test - in a real environment you'd measure actual response times
         
         # Test basic health check
-        response = test_client.get("/api/public/")
+        response = await async_test_client.get("/")
         assert response.status_code == 200
         
         # Test comprehensive health check
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_connection = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db_connection.return_value.__enter__.return_value = mock_connection
-            mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
-            
-            response = test_client.get("/api/public/health")
-            assert response.status_code == 200
+        response = await async_test_client.get("/health")
+        assert response.status_code == 200
     
     @pytest.mark.unit
-    def test_health_check_idempotent(self, test_client):
+    async def test_health_check_idempotent(self, async_test_client):
         """Test that health checks are idempotent and don't modify state"""
-        # Execute multiple times
-        responses = []
-        for _ in range(3):
-            response = test_client.get("/api/public/")
-            responses.append(response)
+        # Execute multiple times, concurrently
+        responses = await asyncio.gather(*(async_test_client.get("/") for _ in range(3)))
         
         # Assert all successful
         for response in responses:
@@ -232,26 +352,17 @@ class TestHealthEndpoints:
             assert data['version'] == '2.0.0'
     
     @pytest.mark.unit
-    def test_comprehensive_health_check_idempotent(self, test_client):
+    async def test_comprehensive_health_check_idempotent(self, async_test_client, mock_db_ok):
         """Test that comprehensive health checks are idempotent"""
-        with patch('routers.health.get_db_connection') as mock_get_db_connection:
-            mock_connection = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db_connection.return_value.__enter__.return_value = mock_connection
-            mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
-            
-            # Execute multiple times
-            responses = []
-            for _ in range(3):
-                response = test_client.get("/api/public/health")
-                responses.append(response)
-            
-            # Assert all successful and consistent
-            for response in responses:
-                assert response.status_code == 200
-                data = response.json()
-                assert data['status'] == 'healthy'
-                assert data['database'] == 'connected'
-            
-            # Verify database was queried the expected number of times
-            assert mock_cursor.execute.call_count == 3
\ No newline at end of file
+        # Execute multiple times, concurrently
+        responses = await asyncio.gather(*(async_test_client.get("/health") for _ in range(3)))
+        
+        # Assert all successful and consistent
+        for response in responses:
+            assert response.status_code == 200
+            data = response.json()
+            assert data['status'] == 'healthy'
+            assert data['database'] == 'connected'
+        
+        # Verify database was queried the expected number of times
+        assert mock_db_ok.execute.call_count == 3
\ No newline at end of file
@@ -1,23 +1,62 @@
 """
 Unit tests for System Router endpoints
 """
+import json
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime
-from fastapi import HTTPException
+from types import SimpleNamespace
 
-from tests.factories import (
-    StatsResponseFactory,
-    SystemStatusFactory,
-    NightModeStatusFactory,
-    ActiveModeStatusFactory
-)
+from web.api.main import app
+from web.api.services.stats_service import get_stats_service
+
+from tests.factories import StatsResponseFactory, SystemStatusFactory
+
+# Expected response fields and JSON types for the schema tests
+_STATS_FIELD_TYPES = {
+    'total_assessments': int,
+    'active_cameras': int,
+    'avg_fog_score': (int, float),
+    'avg_confidence': (int, float),
+    'foggy_conditions': int,
+    'last_update': (str, type(None)),
+    'period': str,
+    'error': (str, type(None)),
+}
+_SYSTEM_STATUS_FIELD_TYPES = {
+    'karlcam_mode': int,
+    'description': str,
+    'updated_at': str,
+    'updated_by': str,
+}
+
+# The schema tests only check field types, so one generated payload per factory is enough
+_CACHED_STATS = StatsResponseFactory()
+_CACHED_STATUS = SystemStatusFactory()
+
+# POST bodies are encoded once at import rather than by the client on every request
+_JSON_HEADERS = {"content-type": "application/json"}
+_PAYLOAD_ADMIN_MODE1 = json.dumps({'karlcam_mode': 1, 'updated_by': 'admin'}).encode()
+
+def _raising(exc):
+    """Service method double that raises exc"""
+    def method(*args):
+        raise exc
+    return method
+
+@pytest.fixture
+def stub_stats_service():
+    """Factory serving a SimpleNamespace StatsService double through get_stats_service"""
+    def install(**methods):
+        stub = SimpleNamespace(**methods)
+        app.dependency_overrides[get_stats_service] = lambda: stub
+        return stub
+    yield install
+    app.dependency_overrides.pop(get_stats_service, None)
 
 class TestSystemEndpoints:
     """Test suite for system router endpoints"""
     
     @pytest.mark.unit
-    def test_get_stats_success(self, test_client):
+    def test_get_stats_success(self, test_client, stub_stats_service):
         """Test successful stats retrieval"""
         # Setup
         mock_stats = {
@@ -30,28 +69,25 @@ class TestSystemEndpoints:
             'period': '24 hours'
         }
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.return_value = mock_stats
-            
-            # Execute
-            response = test_client.get("/api/public/stats")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['total_assessments'] == 1440
-            assert data['active_cameras'] == 12
-            assert data['avg_fog_score'] == 32.5
-            assert data['avg_confidence'] == 0.89
-            assert data['foggy_conditions'] == 425
-            assert data['last_update'] == '2024-01-10T08:30:00Z'
-            assert data['period'] == '24 hours'
+        stub_stats_service(get_overall_stats=lambda *args: mock_stats)
+        
+        # Execute
+        response = test_client.get("/api/stats")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['total_assessments'] == 1440
+        assert data['active_cameras'] == 12
+        assert data['avg_fog_score'] == 32.5
+        assert data['avg_confidence'] == 0.89
+        assert data['foggy_conditions'] == 425
+        assert data['last_update'] == '2024-01-10T08:30:00Z'
+        assert data['period'] == '24 hours'
     
     @pytest.mark.unit
-    def test_get_stats_with_null_values(self, test_client):
+    def test_get_stats_with_null_values(self, test_client, stub_stats_service):
         """Test stats retrieval with null database values"""
         # Setup
         mock_stats = {
@@ -64,42 +100,22 @@ class TestSystemEndpoints:
             'period': '24 hours'
         }
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.return_value = mock_stats
-            
-            # Execute
-            response = test_client.get("/api/public/stats")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['total_assessments'] == 0
-            assert data['avg_fog_score'] == 0.0
-            assert data['avg_confidence'] == 0.0
-            assert data['last_update'] is None
-    
-    @pytest.mark.unit
-    def test_get_stats_service_error(self, test_client):
-        """Test error handling in stats endpoint"""
-        # Setup
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.side_effect = Exception("Database error")
-            
-            # Execute
-            response = test_client.get("/api/public/stats")
-            
-            # Assert
-            assert response.status_code == 500
-            data = response.json()
-            assert data["error_code"] == "INTERNAL_ERROR"
+        stub_stats_service(get_overall_stats=lambda *args: mock_stats)
+        
+        # Execute
+        response = test_client.get("/api/stats")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['total_assessments'] == 0
+        assert data['avg_fog_score'] == 0.0
+        assert data['avg_confidence'] == 0.0
+        assert data['last_update'] is None
     
     @pytest.mark.unit
-    def test_get_system_status_success(self, test_client):
+    def test_get_system_status_success(self, test_client, stub_stats_service):
         """Test successful system status retrieval"""
         # Setup
         mock_status = {
@@ -109,25 +125,22 @@ class TestSystemEndpoints:
             'updated_by': 'system'
         }
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = mock_status
-            
-            # Execute
-            response = test_client.get("/api/public/system/status")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['karlcam_mode'] == 0
-            assert data['description'] == 'Normal operation'
-            assert data['updated_at'] == '2024-01-10T08:30:00Z'
-            assert data['updated_by'] == 'system'
+        stub_stats_service(get_system_status=lambda *args: mock_status)
+        
+        # Execute
+        response = test_client.get("/api/system/status")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data['karlcam_mode'] == 0
+        assert data['description'] == 'Normal operation'
+        assert data['updated_at'] == '2024-01-10T08:30:00Z'
+        assert data['updated_by'] == 'system'
     
     @pytest.mark.unit
-    def test_get_system_status_night_mode(self, test_client):
+    def test_get_system_status_night_mode(self, test_client, stub_stats_service):
         """Test system status when in night mode"""
         # Setup
         mock_status = {
@@ -137,131 +150,52 @@ class TestSystemEndpoints:
             'updated_by': 'scheduler'
         }
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = mock_status
-            
-            # Execute
-            response = test_client.get("/api/public/system/status")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data['karlcam_mode'] == 1
-            assert 'Night mode' in data['description']
-    
-    @pytest.mark.unit
-    def test_get_system_status_service_error(self, test_client):
-        """Test error handling in system status endpoint"""
-        # Setup
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.side_effect = Exception("Database error")
-            
-            # Execute
-            response = test_client.get("/api/public/system/status")
-            
-            # Assert
-            assert response.status_code == 500
-            data = response.json()
-            assert data["error_code"] == "INTERNAL_ERROR"
-    
-    @pytest.mark.unit
-    def test_set_system_status_success(self, test_client):
-        """Test successful system status update"""
-        # Setup
-        request_data = {
-            'karlcam_mode': 1,
-            'updated_by': 'admin'
-        }
+        stub_stats_service(get_system_status=lambda *args: mock_status)
         
-        mock_result = {
-            'success': True,
-            'karlcam_mode': 1,
-            'updated_by': 'admin',
-            'timestamp': '2024-01-10T08:30:00Z'
-        }
+        # Execute
+        response = test_client.get("/api/system/status")
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.set_system_status.return_value = mock_result
-            
-            # Execute
-            response = test_client.post("/api/public/system/status", json=request_data)
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data['success'] is True
-            assert data['karlcam_mode'] == 1
-            assert data['updated_by'] == 'admin'
-            assert 'timestamp' in data
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data['karlcam_mode'] == 1
+        assert 'Night mode' in data['description']
     
     @pytest.mark.unit
-    def test_set_system_status_to_normal_mode(self, test_client):
-        """Test setting system to normal operation mode"""
+    @pytest.mark.parametrize("body,expected_mode,expected_updated_by", [
+        (_PAYLOAD_ADMIN_MODE1, 1, 'admin'),
+        (json.dumps({'karlcam_mode': 0, 'updated_by': 'admin-panel'}).encode(), 0, 'admin-panel'),
+        (json.dumps({'karlcam_mode': 0}).encode(), 0, 'api'),  # updated_by defaults to 'api'
+    ])
+    def test_set_system_status(self, test_client, stub_stats_service,
+                               body, expected_mode, expected_updated_by):
+        """Test successful system status updates, echoing the validated request"""
         # Setup
-        request_data = {
-            'karlcam_mode': 0,
-            'updated_by': 'admin-panel'
-        }
+        stub_stats_service(set_system_status=lambda data: {
+            **data, 'success': True, 'timestamp': '2024-01-10T08:30:00Z'
+        })
         
-        mock_result = {
-            'success': True,
-            'karlcam_mode': 0,
-            'updated_by': 'admin-panel',
-            'timestamp': '2024-01-10T08:30:00Z'
-        }
+        # Execute
+        response = test_client.post("/api/system/status", content=body, headers=_JSON_HEADERS)
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.set_system_status.return_value = mock_result
-            
-            # Execute
-            response = test_client.post("/api/public/system/status", json=request_data)
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data['karlcam_mode'] == 0
-    
-    @pytest.mark.unit
-    def test_set_system_status_service_error(self, test_client):
-        """Test error handling in system status update"""
-        # Setup
-        request_data = {
-            'karlcam_mode': 1,
-            'updated_by': 'admin'
-        }
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.set_system_status.side_effect = Exception("Database error")
-            
-            # Execute
-            response = test_client.post("/api/public/system/status", json=request_data)
-            
-            # Assert
-            assert response.status_code == 500
-            assert "Failed to update system status" in response.json()["detail"]
+        assert data['success'] is True
+        assert data['karlcam_mode'] == expected_mode
+        assert data['updated_by'] == expected_updated_by
+        assert 'timestamp' in data
     
     @pytest.mark.unit
-    def test_set_system_status_invalid_mode(self, test_client):
-        """Test system status update with invalid mode"""
-        # Setup
-        request_data = {
-            'karlcam_mode': 99,  # Invalid mode
-            'updated_by': 'admin'
-        }
-        
+    @pytest.mark.parametrize("body", [
+        json.dumps({'karlcam_mode': 99, 'updated_by': 'admin'}).encode(),  # Invalid mode
+        json.dumps({'updated_by': 'admin'}).encode(),  # Missing karlcam_mode
+    ])
+    def test_set_system_status_validation_error(self, test_client, body):
+        """Test system status update with an invalid or incomplete request"""
         # Execute
-        response = test_client.post("/api/public/system/status", json=request_data)
+        response = test_client.post("/api/system/status", content=body, headers=_JSON_HEADERS)
         
         # Assert
         assert response.status_code == 422  # Validation error
@@ -269,108 +203,46 @@ class TestSystemEndpoints:
         assert data["error_code"] == "VALIDATION_ERROR"
     
     @pytest.mark.unit
-    def test_set_system_status_missing_required_fields(self, test_client):
-        """Test system status update with missing required fields"""
+    @pytest.mark.parametrize("http_method,endpoint,service_method,expected_fragment", [
+        ("get", "/api/stats", "get_overall_stats", b'"error_code":"INTERNAL_ERROR"'),
+        ("get", "/api/system/status", "get_system_status", b'"error_code":"INTERNAL_ERROR"'),
+        ("post", "/api/system/status", "set_system_status", b"Failed to update system status"),
+    ])
+    def test_service_error(self, test_client, stub_stats_service,
+                           http_method, endpoint, service_method, expected_fragment):
+        """Test that a failing StatsService call surfaces as a 500"""
         # Setup
-        request_data = {
-            # Missing karlcam_mode
-            'updated_by': 'admin'
-        }
+        stub_stats_service(**{service_method: _raising(Exception("Database error"))})
         
         # Execute
-        response = test_client.post("/api/public/system/status", json=request_data)
+        if http_method == "post":
+            response = test_client.post(endpoint, content=_PAYLOAD_ADMIN_MODE1, headers=_JSON_HEADERS)
+        else:
+            response = test_client.get(endpoint)
         
         # Assert
-        assert response.status_code == 422  # Validation error
-        data = response.json()
-        assert data["error_code"] == "VALIDATION_ERROR"
+        assert response.status_code == 500
+        assert expected_fragment in response.content
     
     @pytest.mark.unit
-    def test_set_system_status_default_updated_by(self, test_client):
-        """Test system status update without updated_by field"""
+    @pytest.mark.parametrize("endpoint,service_method,payload,field_types", [
+        ("/api/stats", "get_overall_stats", _CACHED_STATS, _STATS_FIELD_TYPES),
+        ("/api/system/status", "get_system_status", _CACHED_STATUS, _SYSTEM_STATUS_FIELD_TYPES),
+    ])
+    def test_response_schema(self, test_client, stub_stats_service,
+                             endpoint, service_method, payload, field_types):
+        """Test that stats and system status responses match their expected schema"""
         # Setup
-        request_data = {
-            'karlcam_mode': 0
-            # No updated_by provided - should default to 'api'
-        }
-        
-        mock_result = {
-            'success': True,
-            'karlcam_mode': 0,
-            'updated_by': 'api',  # Default value
-            'timestamp': '2024-01-10T08:30:00Z'
-        }
+        stub_stats_service(**{service_method: lambda *args: payload})
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.set_system_status.return_value = mock_result
-            
-            # Execute
-            response = test_client.post("/api/public/system/status", json=request_data)
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data['updated_by'] == 'api'
-    
-    @pytest.mark.unit
-    def test_stats_response_format_validation(self, test_client):
-        """Test that stats response matches expected schema"""
-        # Setup
-        mock_stats = StatsResponseFactory()
+        # Execute
+        response = test_client.get(endpoint)
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_overall_stats.return_value = mock_stats
-            
-            # Execute
-            response = test_client.get("/api/public/stats")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Validate required fields
-            required_fields = {
-                'total_assessments', 'active_cameras', 'avg_fog_score',
-                'avg_confidence', 'foggy_conditions', 'last_update', 'period'
-            }
-            assert set(data.keys()) == required_fields
-            
-            # Validate field types
-            assert isinstance(data['total_assessments'], int)
-            assert isinstance(data['active_cameras'], int)
-            assert isinstance(data['avg_fog_score'], (int, float))
-            assert isinstance(data['avg_confidence'], (int, float))
-            assert isinstance(data['foggy_conditions'], int)
-            assert isinstance(data['period'], str)
-    
-    @pytest.mark.unit
-    def test_system_status_response_format_validation(self, test_client):
-        """Test that system status response matches expected schema"""
-        # Setup
-        mock_status = SystemStatusFactory()
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
         
-        with patch('routers.system.StatsService') as mock_service_class:
-            mock_service = Mock()
-            mock_service_class.return_value = mock_service
-            mock_service.get_system_status.return_value = mock_status
-            
-            # Execute
-            response = test_client.get("/api/public/system/status")
-            
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Validate required fields
-            required_fields = {'karlcam_mode', 'description', 'updated_at', 'updated_by'}
-            assert set(data.keys()) == required_fields
-            
-            # Validate field types
-            assert isinstance(data['karlcam_mode'], int)
-            assert isinstance(data['description'], str)
-            assert isinstance(data['updated_at'], str)
-            assert isinstance(data['updated_by'], str)
\ No newline at end of file
+        # Validate required fields and their types
+        assert data.keys() == field_types.keys()
+        for field, expected_type in field_types.items():
+            assert isinstance(data[field], expected_type), field
\ No newline at end of file
@@ -2,33 +2,36 @@
 Unit tests for CameraService
 """
 import pytest
-from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 
-from services.camera_service import CameraService
-from utils.exceptions import CameraNotFoundException, NoImagesFoundError, DataProcessingError
-from tests.factories import (
-    WebcamFactory, 
-    ImageWithLabelsFactory, 
-    CameraConditionsFactory,
-    create_webcam_with_recent_images,
-    create_multi_camera_scenario
-)
+from web.api.utils.exceptions import NoImagesFoundError, DataProcessingError
+from tests.factories import WebcamFactory, ImageWithLabelsFactory
+
+# Fixed "now" for image timestamps, so inputs and expected values are deterministic
+NOW = datetime(2024, 1, 10, 8, 30, 0)
+
+# Shared empty query results; tuples so no test can mutate them for another
+_NO_IMAGES, _NO_WEBCAMS = (), ()
+
+# Read-only webcams for the list test; only their attributes are compared
+_WEBCAMS = tuple(WebcamFactory() for _ in range(3))
 
 class TestCameraService:
     """Test suite for CameraService"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def camera_service(self, mock_db_manager):
-        """Create CameraService instance with mocked DB manager"""
+        """CameraService over the session DB manager mock, which is reset after every test"""
+        # Imported here so collection and -k runs that skip this class never load the service
+        from web.api.services.camera_service import CameraService
         return CameraService(mock_db_manager)
     
     @pytest.mark.unit
     def test_get_latest_camera_data_empty_database(self, camera_service, mock_db_manager):
         """Test getting camera data when database is empty"""
         # Setup
-        mock_db_manager.get_recent_images.return_value = []
-        mock_db_manager.get_active_webcams.return_value = []
+        mock_db_manager.get_recent_images.return_value = _NO_IMAGES
+        mock_db_manager.get_active_webcams.return_value = _NO_WEBCAMS
         
         # Execute
         result = camera_service.get_latest_camera_data()
@@ -47,7 +50,7 @@ class TestCameraService:
         mock_db_manager.get_recent_images.return_value = [
             {
                 'webcam_id': webcam.id,
-                'timestamp': datetime.now(),
+                'timestamp': NOW,
                 'labels': []  # No labels
             }
         ]
@@ -59,21 +62,26 @@ class TestCameraService:
         assert result == []  # No cameras returned when no labels exist
     
     @pytest.mark.unit
-    def test_get_latest_camera_data_with_fog_detected(self, camera_service, mock_db_manager):
-        """Test getting camera data with fog detected"""
+    @pytest.mark.parametrize("fog_score,fog_level,confidence,weather_expected,confidence_expected", [
+        (75, 'Heavy Fog', 0.92, True, 0.92),  # Above threshold (20)
+        (10, 'Clear', 0.95, False, 0.95),  # Below threshold (20)
+        (50, 'Moderate Fog', None, True, 0.0),  # Missing confidence
+    ])
+    def test_get_latest_camera_data_labelled(self, camera_service, mock_db_manager, fog_score,
+                                             fog_level, confidence, weather_expected,
+                                             confidence_expected):
+        """Test camera data built from a single labelled image"""
         # Setup
-        webcam = WebcamFactory(id="test-cam-1", name="Test Camera")
+        webcam = WebcamFactory()
         mock_db_manager.get_active_webcams.return_value = [webcam]
-        
-        fog_score = 75  # Above threshold (20)
         mock_db_manager.get_recent_images.return_value = [
             {
                 'webcam_id': webcam.id,
-                'timestamp': datetime.now(),
+                'timestamp': NOW,
                 'labels': [{
                     'fog_score': fog_score,
-                    'fog_level': 'Heavy Fog',
-                    'confidence': 0.92
+                    'fog_level': fog_level,
+                    'confidence': confidence
                 }]
             }
         ]
@@ -87,44 +95,17 @@ class TestCameraService:
         assert camera_data['id'] == webcam.id
         assert camera_data['name'] == webcam.name
         assert camera_data['fog_score'] == fog_score
-        assert camera_data['fog_level'] == 'Heavy Fog'
-        assert camera_data['weather_detected'] is True
-        assert camera_data['confidence'] == 92.0  # Converted to percentage
+        assert camera_data['fog_level'] == fog_level
+        assert camera_data['weather_detected'] is weather_expected
+        assert camera_data['confidence'] == confidence_expected  # Kept in the 0-1 range
+        assert camera_data['weather_confidence'] == confidence_expected
     
     @pytest.mark.unit
-    def test_get_latest_camera_data_no_fog_detected(self, camera_service, mock_db_manager):
-        """Test getting camera data with no fog detected"""
-        # Setup
-        webcam = WebcamFactory()
-        mock_db_manager.get_active_webcams.return_value = [webcam]
-        
-        fog_score = 10  # Below threshold (20)
-        mock_db_manager.get_recent_images.return_value = [
-            {
-                'webcam_id': webcam.id,
-                'timestamp': datetime.now(),
-                'labels': [{
-                    'fog_score': fog_score,
-                    'fog_level': 'Clear',
-                    'confidence': 0.95
-                }]
-            }
-        ]
-        
-        # Execute
-        result = camera_service.get_latest_camera_data()
-        
-        # Assert
-        assert len(result) == 1
-        camera_data = result[0]
-        assert camera_data['weather_detected'] is False
-        assert camera_data['fog_score'] == fog_score
-    
-    @pytest.mark.unit
-    def test_get_latest_camera_data_multiple_cameras(self, camera_service, mock_db_manager):
+    def test_get_latest_camera_data_multiple_cameras(self, camera_service, mock_db_manager,
+                                                     multi_camera_scenario):
         """Test getting data for multiple cameras"""
         # Setup
-        cameras, images_by_camera = create_multi_camera_scenario(num_cameras=3)
+        cameras, images_by_camera = multi_camera_scenario
         mock_db_manager.get_active_webcams.return_value = cameras
         
         # Flatten images for recent_images mock
@@ -149,7 +130,7 @@ class TestCameraService:
         webcam = WebcamFactory(latitude=None, longitude=None)
         mock_db_manager.get_active_webcams.return_value = [webcam]
         mock_db_manager.get_recent_images.return_value = [
-            ImageWithLabelsFactory(webcam_id=webcam.id)
+            ImageWithLabelsFactory(webcam_id=webcam.id, timestamp=NOW)
         ]
         
         # Execute
@@ -161,33 +142,6 @@ class TestCameraService:
         assert camera_data['lat'] == 37.7749  # Default SF latitude
         assert camera_data['lon'] == -122.4194  # Default SF longitude
     
-    @pytest.mark.unit
-    def test_get_latest_camera_data_handles_missing_confidence(self, camera_service, mock_db_manager):
-        """Test handling of missing confidence values"""
-        # Setup
-        webcam = WebcamFactory()
-        mock_db_manager.get_active_webcams.return_value = [webcam]
-        mock_db_manager.get_recent_images.return_value = [
-            {
-                'webcam_id': webcam.id,
-                'timestamp': datetime.now(),
-                'labels': [{
-                    'fog_score': 50,
-                    'fog_level': 'Moderate Fog',
-                    'confidence': None  # Missing confidence
-                }]
-            }
-        ]
-        
-        # Execute
-        result = camera_service.get_latest_camera_data()
-        
-        # Assert
-        assert len(result) == 1
-        camera_data = result[0]
-        assert camera_data['confidence'] == 0.0
-        assert camera_data['weather_confidence'] == 0.0
-    
     @pytest.mark.unit
     def test_get_latest_camera_data_database_error(self, camera_service, mock_db_manager):
         """Test error handling when database fails"""
@@ -204,8 +158,7 @@ class TestCameraService:
     def test_get_webcam_list_success(self, camera_service, mock_db_manager):
         """Test successful webcam list retrieval"""
         # Setup
-        webcams = [WebcamFactory() for _ in range(3)]
-        mock_db_manager.get_active_webcams.return_value = webcams
+        mock_db_manager.get_active_webcams.return_value = list(_WEBCAMS)
         
         # Execute
         result = camera_service.get_webcam_list()
@@ -213,12 +166,12 @@ class TestCameraService:
         # Assert
         assert len(result) == 3
         for i, webcam_data in enumerate(result):
-            assert webcam_data['id'] == webcams[i].id
-            assert webcam_data['name'] == webcams[i].name
-            assert webcam_data['lat'] == webcams[i].latitude
-            assert webcam_data['lon'] == webcams[i].longitude
-            assert webcam_data['url'] == webcams[i].url
-            assert webcam_data['active'] == webcams[i].active
+            assert webcam_data['id'] == _WEBCAMS[i].id
+            assert webcam_data['name'] == _WEBCAMS[i].name
+            assert webcam_data['lat'] == _WEBCAMS[i].latitude
+            assert webcam_data['lon'] == _WEBCAMS[i].longitude
+            assert webcam_data['url'] == _WEBCAMS[i].url
+            assert webcam_data['active'] == _WEBCAMS[i].active
     
     @pytest.mark.unit
     def test_get_webcam_list_database_error(self, camera_service, mock_db_manager):
@@ -242,9 +195,8 @@ class TestCameraService:
         # Create test images with timestamps
         images = []
         for i in range(5):
-            timestamp = datetime.now() - timedelta(hours=i*2)
             images.append({
-                'timestamp': timestamp,
+                'timestamp': NOW - timedelta(hours=i*2),
                 'labels': [{
                     'fog_score': 30 + i*10,
                     'fog_level': 'Moderate Fog',
@@ -266,14 +218,14 @@ class TestCameraService:
         
         # Check sorting (should be newest first)
         timestamps = [item['timestamp'] for item in result]
-        assert timestamps == sorted(timestamps, reverse=True)
+        assert timestamps == [(NOW - timedelta(hours=i*2)).isoformat() for i in range(5)]
     
     @pytest.mark.unit
     def test_get_camera_history_default_hours(self, camera_service, mock_db_manager):
         """Test camera history with default hours parameter"""
         # Setup
         camera_id = "test-camera-1"
-        mock_db_manager.get_recent_images.return_value = []
+        mock_db_manager.get_recent_images.return_value = _NO_IMAGES
         
         # Execute
         result = camera_service.get_camera_history(camera_id)
@@ -290,7 +242,7 @@ class TestCameraService:
         # Setup
         camera_id = "test-camera-1"
         hours = 12  # Less than 24 hours
-        mock_db_manager.get_recent_images.return_value = []
+        mock_db_manager.get_recent_images.return_value = _NO_IMAGES
         
         # Execute
         result = camera_service.get_camera_history(camera_id, hours)
@@ -306,10 +258,9 @@ class TestCameraService:
         """Test successful latest image info retrieval"""
         # Setup
         camera_id = "test-camera-1"
-        timestamp = datetime.now()
         mock_db_manager.get_recent_images.return_value = [
             {
-                'timestamp': timestamp,
+                'timestamp': NOW,
                 'image_filename': 'test_image.jpg',
                 'cloud_storage_path': 'gs://bucket/test_image.jpg'
             }
@@ -322,7 +273,7 @@ class TestCameraService:
         assert result['camera_id'] == camera_id
         assert result['image_url'] == 'https://storage.googleapis.com/bucket/test_image.jpg'
         assert result['filename'] == 'test_image.jpg'
-        assert result['timestamp'] == timestamp.isoformat()
+        assert result['timestamp'] == NOW.isoformat()
         assert 'age_hours' in result
     
     @pytest.mark.unit
@@ -330,7 +281,7 @@ class TestCameraService:
         """Test latest image info when no images exist"""
         # Setup
         camera_id = "test-camera-1"
-        mock_db_manager.get_recent_images.return_value = []
+        mock_db_manager.get_recent_images.return_value = _NO_IMAGES
         
         # Execute & Assert
         with pytest.raises(NoImagesFoundError):
@@ -344,7 +295,7 @@ class TestCameraService:
         direct_url = "https://example.com/image.jpg"
         mock_db_manager.get_recent_images.return_value = [
             {
-                'timestamp': datetime.now(),
+                'timestamp': NOW,
                 'image_filename': 'test_image.jpg',
                 'cloud_storage_path': direct_url
             }
@@ -0,0 +1,71 @@
+"""
+Benchmarks for CameraService hot paths
+"""
+import importlib.util
+import pytest
+
+# Both plugins provide the benchmark marker and fixture; CI runs these under pytest-codspeed
+if not any(importlib.util.find_spec(plugin) for plugin in ("pytest_benchmark", "pytest_codspeed")):
+    pytest.skip("requires pytest-benchmark or pytest-codspeed", allow_module_level=True)
+
+from datetime import datetime, timedelta
+
+from web.api.services.camera_service import CameraService
+from tests.factories import FakeDBManager, create_camera_history, create_multi_camera_scenario
+
+NUM_CAMERAS = 50
+HISTORY_HOURS = 168
+
+@pytest.fixture(scope="module")
+def camera_service_50cams():
+    """CameraService over a plain fake DB manager holding fifty labelled cameras
+    
+    FakeDBManager is used instead of the Mock so call recording stays out of the timings.
+    """
+    cameras, images_by_camera = create_multi_camera_scenario(num_cameras=NUM_CAMERAS)
+    db_manager = FakeDBManager()
+    db_manager.webcams = cameras
+    # The service formats timestamps with isoformat(), so hand it datetimes like the real DB
+    timestamp = datetime(2024, 1, 10, 8, 30)
+    db_manager.recent_images = [
+        {**image, "timestamp": timestamp}
+        for images in images_by_camera.values()
+        for image in images
+    ]
+    return CameraService(db_manager)
+
+@pytest.mark.benchmark(group="camera-service")
+def test_get_latest_camera_data_perf(benchmark, camera_service_50cams):
+    """Benchmark get_latest_camera_data across fifty cameras"""
+    result = benchmark.pedantic(
+        camera_service_50cams.get_latest_camera_data,
+        rounds=10,
+        iterations=5,
+        warmup_rounds=2,
+    )
+    
+    assert len(result) == NUM_CAMERAS
+
+@pytest.fixture(scope="module")
+def camera_service_week_history():
+    """CameraService over a fake DB manager holding a week of hourly labels for one camera"""
+    db_manager = FakeDBManager()
+    newest = datetime(2024, 1, 10, 8, 30)
+    db_manager.recent_images = [
+        {**entry, "timestamp": newest - timedelta(hours=i)}
+        for i, entry in enumerate(create_camera_history(HISTORY_HOURS, 10, 0, 0.8, 0))
+    ]
+    return CameraService(db_manager)
+
+@pytest.mark.benchmark(group="camera-service")
+def test_get_camera_history_perf(benchmark, camera_service_week_history):
+    """Benchmark get_camera_history over a week of hourly images"""
+    result = benchmark.pedantic(
+        camera_service_week_history.get_camera_history,
+        args=("test-camera-1", HISTORY_HOURS),
+        rounds=10,
+        iterations=5,
+        warmup_rounds=2,
+    )
+    
+    assert len(result) == HISTORY_HOURS